@@ -3,13 +3,14 @@ from __future__ import annotations
 import json
 import logging
 import os
+from datetime import datetime
 from typing import Any
 
 from aiohttp import web
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 
 
 from .const import (
@@ -19,15 +20,27 @@ from .const import (
     CONF_PASSWORD,
     CONF_CUSTOMER_ID,
     CONF_MONTHLY_START,
+    CONF_HISTORY_START_DATE,
+    CONF_STORAGE_MODE,
+    CONF_SUCCESS,
+    CONF_ERR_INVALID_AUTH,
+    DATA_API,
+    DATA_INITIAL_UPDATE,
+    DEFAULT_STORAGE_MODE,
 )
-from .data_storage import EVNDataStorage
-from .nestup_evn import EVNAPI
+from .data_storage import async_get_storage, async_release_storage
+from .storage_backends import remove_customer_data
+from .nestup_evn import async_create_api
 from .views import (
     EVNPingView,
     EVNStaticView,
     EVNOptionsView,
     EVNMonthlyDataView,
     EVNDailyDataView,
+    EVNSummaryDataView,
+    EVNExportView,
+    EVNTariffView,
+    EVNBackfillStatusView,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -40,10 +53,12 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up nestup_evn from a config entry."""
 
-    api = EVNAPI(hass, True)
+    # one client per entry, shared by the coordinator, backfill and
+    # monthly sync; its session is closed on unload
+    api = await async_create_api(hass, entry.data.get(CONF_AREA))
 
     try:
-        await api.request_update(
+        data = await api.request_update(
             entry.data.get(CONF_AREA),
             entry.data.get(CONF_USERNAME),
             entry.data.get(CONF_PASSWORD),
@@ -51,9 +66,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             entry.data.get(CONF_MONTHLY_START),
         )
     except Exception as err:
+        await api.async_close()
         raise ConfigEntryNotReady(str(err)) from err
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = entry.data
+    if data.get("status") != CONF_SUCCESS:
+        await api.async_close()
+        if data.get("status") == CONF_ERR_INVALID_AUTH:
+            # retrying cannot help, HA asks the user for a new password
+            raise ConfigEntryAuthFailed("EVN rejected the username or password")
+        raise ConfigEntryNotReady(
+            f"EVN update failed: {data.get('status')}"
+        )
+
+    # the validation result seeds the coordinator's first data
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        DATA_API: api,
+        DATA_INITIAL_UPDATE: data,
+    }
+
+    history_start_iso = entry.data.get(CONF_HISTORY_START_DATE)
+    try:
+        await async_get_storage(
+            hass,
+            entry.data.get(CONF_CUSTOMER_ID),
+            history_start_date=(
+                datetime.strptime(history_start_iso, "%Y-%m-%d").date()
+                if history_start_iso
+                else None
+            ),
+            storage_mode=entry.options.get(
+                CONF_STORAGE_MODE,
+                entry.data.get(CONF_STORAGE_MODE, DEFAULT_STORAGE_MODE),
+            ),
+            monthly_start=entry.data.get(CONF_MONTHLY_START),
+        )
+    except Exception:
+        await _async_abort_setup(hass, entry)
+        raise
 
     # Register API views (only once)
     if "api_registered" not in hass.data[DOMAIN]:
@@ -64,6 +113,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.http.register_view(EVNOptionsView(hass))
         hass.http.register_view(EVNMonthlyDataView(hass))
         hass.http.register_view(EVNDailyDataView(hass))
+        hass.http.register_view(EVNSummaryDataView(hass))
+        hass.http.register_view(EVNExportView(hass))
+        hass.http.register_view(EVNTariffView(hass))
+        hass.http.register_view(EVNBackfillStatusView(hass))
 
         hass.data[DOMAIN]["api_registered"] = True
         _LOGGER.info("Registered EVN API endpoints and WebUI at %s", webui_path)
@@ -87,16 +140,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         except Exception as ex:
             _LOGGER.warning("Could not register panel: %s", str(ex))
 
-    await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+    try:
+        await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+    except Exception:
+        await _async_abort_setup(hass, entry)
+        raise
+
+    # a new storage mode applies on reload, which migrates the history
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
 
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_abort_setup(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release what a failed setup already acquired."""
+    entry_data = hass.data[DOMAIN].pop(entry.entry_id, None)
+    await async_release_storage(hass, entry.data.get(CONF_CUSTOMER_ID))
+    if entry_data is not None:
+        await entry_data[DATA_API].async_close()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        await async_release_storage(hass, entry.data.get(CONF_CUSTOMER_ID))
+        if entry_data is not None:
+            await entry_data[DATA_API].async_close()
 
     return unload_ok
 
@@ -115,11 +190,12 @@ async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
         return
 
     storage_dir = hass.config.path("nestup_evn")
-    file_path = os.path.join(storage_dir, f"{customer_id}.json")
 
     try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        removed = await hass.async_add_executor_job(
+            remove_customer_data, storage_dir, customer_id
+        )
+        if removed:
             _LOGGER.info(
                 "[EVN] Removed history data for customer %s",
                 customer_id,
@@ -0,0 +1,269 @@
+"""Login tokens of the EVN accounts, with expiry tracking.
+
+Every area hands out a bearer token, EVNHCMC an ``evn_session`` cookie.
+Tokens are cached per area and username together with their expiry, taken
+from the login response or the JWT ``exp`` claim, and are refreshed in the
+background shortly before they expire. A token of unknown lifetime is
+kept until the server rejects it.
+
+The cache is shared by every config entry, and logins run single-flight
+per key: entries of the same username wait for one login instead of each
+logging in. Logins never touch the live area dict; they return a token,
+which a background refresh applies to its owner's area in one step.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .const import CONF_SUCCESS, DOMAIN, TOKEN_REFRESH_MARGIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_TOKENS = "tokens"
+
+# (area, username), plus the customer ID for per-customer tokens
+TokenKey = Tuple[str, ...]
+
+# area dict fields written by the login_* calls
+SESSION_FIELDS = (
+    "access_token",
+    "evn_session",
+    "refresh_token",
+    "token_expiry",
+    "expires",
+    "login_customer_id",
+)
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """Return the ``exp`` claim of a JWT, None if it is not one."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+def _timestamp(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass
+class AuthToken:
+    """A login session: the credentials requests send and their expiry."""
+
+    access_token: Optional[str] = None
+    evn_session: Optional[str] = None
+    refresh_token: Optional[str] = None
+    expires_at: Optional[float] = None
+    # customer the token acts for, when the login reports it (EVNNPC)
+    customer_id: Optional[str] = None
+
+    @classmethod
+    def from_area(cls, area: dict) -> "AuthToken":
+        """Read the session a login_* call stored in the area dict."""
+        access_token = area.get("access_token")
+        expires_at = _timestamp(area.get("token_expiry")) or _timestamp(
+            area.get("expires")
+        )
+        if expires_at is None and access_token:
+            expires_at = jwt_expiry(access_token)
+
+        return cls(
+            access_token=access_token,
+            evn_session=area.get("evn_session"),
+            refresh_token=area.get("refresh_token"),
+            expires_at=expires_at,
+            customer_id=area.get("login_customer_id"),
+        )
+
+    def apply(self, area: dict):
+        """Write the session back where the request_* calls read it."""
+        area["access_token"] = self.access_token
+        area["evn_session"] = self.evn_session
+        area["refresh_token"] = self.refresh_token
+        area["token_expiry"] = self.expires_at
+        area["login_customer_id"] = self.customer_id
+        area.pop("expires", None)
+
+    @staticmethod
+    def reset(area: dict):
+        """Clear a session from the area dict before logging in again."""
+        for field in SESSION_FIELDS:
+            area.pop(field, None)
+
+    def is_valid(self) -> bool:
+        if not (self.access_token or self.evn_session):
+            return False
+        return self.expires_at is None or time.time() < self.expires_at
+
+    def same_session(self, other: "AuthToken") -> bool:
+        return (
+            self.access_token == other.access_token
+            and self.evn_session == other.evn_session
+        )
+
+
+# logs in and returns (status, token), token None on failure
+LoginFn = Callable[[], Awaitable[Tuple[str, Optional[AuthToken]]]]
+
+# writes a refreshed token where the owner's requests read it
+ApplyFn = Callable[[AuthToken], None]
+
+
+def get_token_manager(hass: HomeAssistant) -> "TokenManager":
+    """Token cache shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_TOKENS not in domain_data:
+        domain_data[DATA_TOKENS] = TokenManager(hass)
+    return domain_data[DATA_TOKENS]
+
+
+class TokenManager:
+    """Caches tokens by key, logs in single-flight and refreshes ahead of expiry.
+
+    The login function of a key belongs to the client that last logged
+    in with it, which is also the one the background refresh runs on.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._tokens: Dict[TokenKey, AuthToken] = {}
+        self._locks: Dict[TokenKey, asyncio.Lock] = {}
+        self._logins: Dict[TokenKey, Tuple[LoginFn, object, Optional[ApplyFn]]] = {}
+        self._timers: Dict[TokenKey, Callable[[], None]] = {}
+
+    def get(self, key: TokenKey) -> Optional[AuthToken]:
+        """Return the cached token, None if missing or expired."""
+        token = self._tokens.get(key)
+        return token if token is not None and token.is_valid() else None
+
+    def adopt(
+        self,
+        key: TokenKey,
+        token: AuthToken,
+        login: LoginFn,
+        owner,
+        apply: Optional[ApplyFn] = None,
+    ) -> AuthToken:
+        """Cache a token obtained elsewhere unless a live one is cached."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        self._set(key, token, login, owner, apply)
+        return token
+
+    async def async_login(
+        self,
+        key: TokenKey,
+        login: LoginFn,
+        owner,
+        force: bool = False,
+        apply: Optional[ApplyFn] = None,
+    ) -> Tuple[str, Optional[AuthToken]]:
+        """Return a live token, running login() once for concurrent callers.
+
+        Callers that queued behind a login get its token without logging
+        in again. force renews the token even if it is still live. A
+        failed login keeps the cached token. apply is what a background
+        refresh of the token calls with its successor.
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            token = self.get(key)
+            if token is not None and not force:
+                return CONF_SUCCESS, token
+
+            status, new_token = await login()
+            if new_token is None:
+                return status, None
+
+            self._set(key, new_token, login, owner, apply)
+            return status, new_token
+
+    def invalidate(self, key: TokenKey, token: Optional[AuthToken] = None):
+        """Drop a token the server has rejected.
+
+        With token given, only that session is dropped, so callers holding
+        an already replaced token do not throw the new one away.
+        """
+        cached = self._tokens.get(key)
+        if cached is None:
+            return
+        if token is not None and not cached.same_session(token):
+            return
+        self._tokens.pop(key, None)
+        self._cancel_timer(key)
+
+    def release(self, owner):
+        """Stop background refreshes that would run on owner.
+
+        The tokens stay cached for the other entries until they expire.
+        """
+        for key, (_, key_owner, _) in list(self._logins.items()):
+            if key_owner is owner:
+                del self._logins[key]
+                self._cancel_timer(key)
+
+    def _set(
+        self,
+        key: TokenKey,
+        token: AuthToken,
+        login: LoginFn,
+        owner,
+        apply: Optional[ApplyFn] = None,
+    ):
+        self._tokens[key] = token
+        self._logins[key] = (login, owner, apply)
+        self._cancel_timer(key)
+
+        if token.expires_at is None:
+            return
+
+        remaining = token.expires_at - time.time()
+        if remaining <= 0:
+            return
+        margin = min(TOKEN_REFRESH_MARGIN.total_seconds(), remaining / 2)
+
+        async def _async_refresh(_now):
+            self._timers.pop(key, None)
+            try:
+                status, new_token = await self.async_login(
+                    key, login, owner, force=True, apply=apply
+                )
+            except Exception as ex:
+                status, new_token = ex, None
+            if new_token is None:
+                # left to expire, the next request logs in again
+                _LOGGER.debug("[EVN] Token refresh failed for %s: %s", key[0], status)
+            elif apply is not None:
+                apply(new_token)
+
+        self._timers[key] = async_call_later(
+            self.hass, remaining - margin, _async_refresh
+        )
+
+    def _cancel_timer(self, key: TokenKey):
+        cancel = self._timers.pop(key, None)
+        if cancel is not None:
+            cancel()
@@ -0,0 +1,436 @@
+"""Daily history backfill: per-area chunk fetchers and a bounded scheduler.
+
+Missing ranges are cut into area-sized chunks. The chunks run concurrently
+under a per-area semaphore and rate limit, shared by every customer of the
+area, and each chunk is merged into storage as soon as it arrives.
+Progress is checkpointed in the storage meta by BackfillState.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    BACKFILL_CHUNK_DAYS,
+    BACKFILL_EMPTY_ATTEMPTS,
+    BACKFILL_EMPTY_GRACE_DAYS,
+    BACKFILL_MAX_CONCURRENCY,
+    BACKFILL_MIN_INTERVAL,
+    BACKFILL_RETRY_BASE,
+    BACKFILL_RETRY_MAX,
+    DEFAULT_BACKFILL_CHUNK_DAYS,
+    DEFAULT_BACKFILL_MAX_CONCURRENCY,
+    DEFAULT_BACKFILL_MIN_INTERVAL,
+    DOMAIN,
+)
+from .history import DayIntervals, parse_day_ordinal
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_BACKFILL_LIMITS = "backfill_limits"
+
+# (date ordinal, kWh) rows parsed from one chunk
+DailyRows = List[Tuple[int, float]]
+
+
+class RateLimiter:
+    """Spaces request starts at least min_interval seconds apart."""
+
+    def __init__(self, min_interval: float):
+        self._min_interval = min_interval
+        self._next_start = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        delay = self._next_start - now
+        self._next_start = max(now, self._next_start) + self._min_interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _area_limits(hass: HomeAssistant, area: str):
+    """Semaphore and rate limiter shared by all customers of an area."""
+    limits = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_BACKFILL_LIMITS, {}
+    )
+    if area not in limits:
+        limits[area] = (
+            asyncio.Semaphore(
+                BACKFILL_MAX_CONCURRENCY.get(
+                    area, DEFAULT_BACKFILL_MAX_CONCURRENCY
+                )
+            ),
+            RateLimiter(
+                BACKFILL_MIN_INTERVAL.get(area, DEFAULT_BACKFILL_MIN_INTERVAL)
+            ),
+        )
+    return limits[area]
+
+
+class BackfillProgress:
+    """In-memory progress of the running (or last) backfill."""
+
+    __slots__ = ("running", "started", "finished", "chunks", "done", "added")
+
+    def __init__(self):
+        self.running = False
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.chunks = 0
+        self.done = 0
+        self.added = 0
+
+    def start(self):
+        self.running = True
+        self.started = time.time()
+        self.finished = None
+        self.chunks = self.done = self.added = 0
+
+    def stop(self):
+        self.running = False
+        self.finished = time.time()
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BackfillState:
+    """Resumable backfill progress, persisted in the storage meta.
+
+        meta["backfill"] = {
+            "chunks": {"<first>:<last>": {"status", "attempts", "next_retry"}},
+            "empty": [[first ordinal, last ordinal], ...],
+        }
+        meta["backfill_done"] = True once no gap older than the grace
+        period is left
+
+    Only chunks still waiting for data have an entry; a chunk whose days
+    arrived simply stops being planned. Days missing from a partial answer
+    get an "empty" entry of their own range. "empty" is the negative cache
+    of days the server has no data for.
+    """
+
+    STATUS_FAILED = "failed"
+    STATUS_EMPTY = "empty"
+
+    def __init__(self, meta: Dict):
+        self._meta = meta
+        state = meta.setdefault("backfill", {})
+        self.chunks: Dict[str, Dict] = state.setdefault("chunks", {})
+        self.empty = DayIntervals()
+        for lo, hi in state.get("empty", []):
+            self.empty.add(lo, hi)
+
+    @staticmethod
+    def key(start: date, end: date) -> str:
+        return f"{start.toordinal()}:{end.toordinal()}"
+
+    @property
+    def done(self) -> bool:
+        return bool(self._meta.get("backfill_done"))
+
+    def set_done(self, done: bool) -> bool:
+        """Returns True when the flag changed."""
+        if self.done == done:
+            return False
+        self._meta["backfill_done"] = done
+        return True
+
+    def prune(self, chunks: List[Tuple[date, date]]):
+        """Forget entries of ranges no planned chunk overlaps any more.
+
+        Entries inside a larger chunk are kept, so the days a single
+        whole-range request keeps missing still count their attempts.
+        """
+        planned = DayIntervals()
+        for start, end in chunks:
+            planned.add(start.toordinal(), end.toordinal())
+
+        for key in list(self.chunks):
+            lo, hi = (int(part) for part in key.split(":"))
+            if planned.gaps(lo, hi) == [(lo, hi)]:
+                del self.chunks[key]
+
+    def is_due(self, start: date, end: date, now: float) -> bool:
+        entry = self.chunks.get(self.key(start, end))
+        return entry is None or entry.get("next_retry", 0) <= now
+
+    def _retry_later(self, key: str, status: str, now: float, attempts: int = 0):
+        entry = self.chunks.setdefault(key, {"attempts": attempts})
+        entry["attempts"] += 1
+        entry["status"] = status
+        delay = min(
+            BACKFILL_RETRY_BASE * 2 ** (entry["attempts"] - 1),
+            BACKFILL_RETRY_MAX,
+        )
+        entry["next_retry"] = now + delay.total_seconds()
+        return entry
+
+    def record_failure(self, start: date, end: date, now: float):
+        self._retry_later(self.key(start, end), self.STATUS_FAILED, now)
+
+    def _record_empty(self, lo: int, hi: int, now: float, attempts: int = 0):
+        """Back off a range answered without data.
+
+        It goes to the negative cache once BACKFILL_EMPTY_ATTEMPTS answers
+        lacked it, except for the days inside the grace period.
+        """
+        entry = self._retry_later(f"{lo}:{hi}", self.STATUS_EMPTY, now, attempts)
+        hi = min(hi, date.today().toordinal() - BACKFILL_EMPTY_GRACE_DAYS)
+        if entry["attempts"] >= BACKFILL_EMPTY_ATTEMPTS and lo <= hi:
+            self.empty.add(lo, hi)
+
+    def record_result(
+        self, start: date, end: date, rows: "DailyRows", now: float
+    ):
+        """Book a chunk answer; days it lacks are retried like empty chunks."""
+        if not rows:
+            self._record_empty(start.toordinal(), end.toordinal(), now)
+            return
+
+        # the days still missing carry on the empty answers of the chunk
+        entry = self.chunks.pop(self.key(start, end), None) or {}
+        attempts = (
+            entry.get("attempts", 0)
+            if entry.get("status") == self.STATUS_EMPTY
+            else 0
+        )
+
+        returned = DayIntervals()
+        for ordinal, _ in rows:
+            returned.add(ordinal)
+        for gap_lo, gap_hi in returned.gaps(start.toordinal(), end.toordinal()):
+            self._record_empty(gap_lo, gap_hi, now, attempts)
+
+    def dump(self):
+        """Write the negative cache back into the meta dict."""
+        self._meta["backfill"]["empty"] = [list(run) for run in self.empty]
+
+
+def plan_chunks(
+    ranges: List[Tuple[date, date]], chunk_days: int
+) -> List[Tuple[date, date]]:
+    """Cut missing ranges into requests of at most chunk_days days.
+
+    chunk_days 0 means the API ignores the range, so a single request
+    covering every gap is enough.
+    """
+    if not ranges:
+        return []
+    if chunk_days <= 0:
+        return [(ranges[0][0], ranges[-1][1])]
+
+    chunks = []
+    step = timedelta(days=chunk_days)
+    for start, end in ranges:
+        while start <= end:
+            chunk_end = min(end, start + step - timedelta(days=1))
+            chunks.append((start, chunk_end))
+            start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+# ----------------------------------------------------------------------
+# RESPONSE PARSERS (shared with the regular update path)
+# ----------------------------------------------------------------------
+def parse_daily_rows(
+    rows, day_key: str, kwh_key: str, parse, start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> DailyRows:
+    """Extract (ordinal, kWh) rows, optionally limited to [start, end]."""
+    lo = start.toordinal() if start else None
+    hi = end.toordinal() if end else None
+    out = []
+    for d in rows:
+        day = d.get(day_key)
+        kwh = d.get(kwh_key)
+        if not day or kwh is None:
+            continue
+        try:
+            ordinal = parse(day)
+            kwh = float(str(kwh).replace(",", "") or 0)
+        except Exception:
+            continue
+        if ordinal is None:
+            continue
+        if (lo is None or ordinal >= lo) and (hi is None or ordinal <= hi):
+            out.append((ordinal, kwh))
+    return out
+
+
+def parse_meter_rows(rows, day_key: str, reading_key: str, parse) -> DailyRows:
+    """Turn daily meter readings into (ordinal, kWh) rows.
+
+    A day's kWh is the next reading minus its own, so the last reading
+    yields no row.
+    """
+    readings = parse_daily_rows(rows, day_key, reading_key, parse)
+    readings.sort(key=lambda x: x[0])
+    return [
+        (prev_day, round(max(0.0, cur - prev), 3))
+        for (prev_day, prev), (_, cur) in zip(readings, readings[1:])
+    ]
+
+
+def slash_date_ordinal(value: str) -> int:
+    return datetime.strptime(value, "%d/%m/%Y").date().toordinal()
+
+
+def iso_date_ordinal(value: str) -> int:
+    return datetime.fromisoformat(value.replace("Z", "")).date().toordinal()
+
+
+# ----------------------------------------------------------------------
+# PER-AREA CHUNK FETCHERS
+# ----------------------------------------------------------------------
+async def _fetch_evnspc(api, customer_id: str, start: date, end: date):
+    raw = await api.fetch_daily_range_evnspc(
+        customer_id, start.strftime("%d-%m-%Y"), end.strftime("%d-%m-%Y")
+    )
+    if not isinstance(raw, list):
+        return []
+    return parse_daily_rows(
+        raw, "strTime", "dSanLuongBT", slash_date_ordinal, start, end
+    )
+
+
+async def _fetch_evnnpc(api, customer_id: str, start: date, end: date):
+    raw = await api.fetch_daily_range_evnnpc(customer_id, start, end)
+    if not isinstance(raw, list):
+        return []
+    return parse_daily_rows(
+        raw, "NGAY", "DIEN_TTHU", slash_date_ordinal, start, end
+    )
+
+
+async def _fetch_evncpc(api, customer_id: str, start: date, end: date):
+    raw = await api.fetch_daily_range_evncpc(customer_id)
+    if not isinstance(raw, list):
+        return []
+    return parse_daily_rows(
+        raw, "ngay", "sanLuongNgay", iso_date_ordinal, start, end
+    )
+
+
+async def _fetch_evnhcmc(api, customer_id: str, start: date, end: date):
+    raw = await api.fetch_daily_range_evnhcmc(
+        customer_id, start.strftime("%d/%m/%Y"), end.strftime("%d/%m/%Y")
+    )
+    if not isinstance(raw, list):
+        return []
+    return parse_daily_rows(
+        raw, "ngayFull", "Tong", parse_day_ordinal, start, end
+    )
+
+
+async def _fetch_evnhanoi(api, customer_id: str, start: date, end: date):
+    # a day's kWh is the next day's meter reading minus its own, so the
+    # reading of the day after the chunk is needed too
+    raw = await api.fetch_daily_range_evnhanoi(
+        customer_id, start, end + timedelta(days=1)
+    )
+    if not isinstance(raw, list):
+        return []
+
+    for d in raw:
+        d["ngayShort"] = d.get("ngayShort") or d.get("ngay")
+    lo, hi = start.toordinal(), end.toordinal()
+    return [
+        (day, kwh)
+        for day, kwh in parse_meter_rows(
+            raw, "ngayShort", "chiSo", slash_date_ordinal
+        )
+        if lo <= day <= hi
+    ]
+
+
+DAILY_FETCHERS = {
+    "EVNSPC": _fetch_evnspc,
+    "EVNNPC": _fetch_evnnpc,
+    "EVNCPC": _fetch_evncpc,
+    "EVNHCMC": _fetch_evnhcmc,
+    "EVNHANOI": _fetch_evnhanoi,
+}
+
+
+# ----------------------------------------------------------------------
+# SCHEDULER
+# ----------------------------------------------------------------------
+def _update_done(storage, state: BackfillState) -> bool:
+    cutoff = date.today() - timedelta(days=BACKFILL_EMPTY_GRACE_DAYS)
+    return state.set_done(
+        all(start > cutoff for start, _ in storage.get_missing_daily_ranges())
+    )
+
+
+async def async_backfill_daily(
+    storage, api, progress: Optional[BackfillProgress] = None
+) -> int:
+    """Fetch every missing day of storage, returns the number of days added.
+
+    Chunks waiting for a retry are skipped, so a run with nothing due
+    makes no request at all.
+    """
+    area = api._evn_area.get("name")
+    fetcher = DAILY_FETCHERS.get(area)
+    if fetcher is None:
+        return 0
+
+    state: BackfillState = storage.backfill
+    chunks = plan_chunks(
+        storage.get_missing_daily_ranges(),
+        BACKFILL_CHUNK_DAYS.get(area, DEFAULT_BACKFILL_CHUNK_DAYS),
+    )
+    state.prune(chunks)
+
+    now = time.time()
+    due = [(start, end) for start, end in chunks if state.is_due(start, end, now)]
+    if not due:
+        if _update_done(storage, state):
+            storage.async_schedule_save(meta=True)
+        return 0
+
+    semaphore, limiter = _area_limits(storage.hass, area)
+    progress = progress or BackfillProgress()
+    progress.chunks = len(due)
+
+    async def run_chunk(start: date, end: date):
+        try:
+            async with semaphore:
+                await limiter.wait()
+                rows = await fetcher(api, storage.customer_id, start, end)
+        except Exception as ex:
+            _LOGGER.warning(
+                "[EVN] Backfill %s → %s failed for %s: %s",
+                start,
+                end,
+                storage.customer_id,
+                ex,
+            )
+            state.record_failure(start, end, time.time())
+        else:
+            state.record_result(start, end, rows, time.time())
+            progress.added += storage.merge_daily(rows)
+        progress.done += 1
+
+        # checkpoint the state with every chunk
+        state.dump()
+        storage.async_schedule_save(meta=True)
+
+    await asyncio.gather(*(run_chunk(start, end) for start, end in due))
+
+    if _update_done(storage, state):
+        storage.async_schedule_save(meta=True)
+
+    _LOGGER.debug(
+        "[EVN] Backfill for %s: %d/%d chunks due, %d days added",
+        storage.customer_id,
+        len(due),
+        len(chunks),
+        progress.added,
+    )
+    return progress.added
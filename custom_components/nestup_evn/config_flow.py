@@ -3,20 +3,23 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Mapping
 from datetime import datetime
 import os
 
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
 from . import nestup_evn
 from .data_storage import EVNDataStorage
+from .retry import EVNRequestError
 from .const import (
     CONF_AREA,
     CONF_CUSTOMER_ID,
+    CONF_ERR_CANNOT_CONNECT,
     CONF_ERR_UNKNOWN,
     CONF_MONTHLY_START,
     CONF_PASSWORD,
@@ -24,6 +27,9 @@ from .const import (
     CONF_USERNAME,
     DOMAIN,
     CONF_HISTORY_START_DATE,
+    CONF_STORAGE_MODE,
+    DEFAULT_STORAGE_MODE,
+    STORAGE_MODES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,6 +45,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._api: nestup_evn.EVNAPI | None = None
         self._errors: dict[str, str] = {}
         self._branches_data = None
+        self._reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        return OptionsFlowHandler(config_entry)
 
     async def _load_branches_data(self):
         """Load EVN branches data asynchronously."""
@@ -95,19 +109,32 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 else:
                     self._user_data[CONF_AREA] = evn_info["evn_area"]
 
-                    self._api = nestup_evn.EVNAPI(self.hass, True)
-
-                    login_state = await self._api.login(
-                        self._user_data[CONF_AREA],
-                        self._user_data[CONF_USERNAME],
-                        self._user_data[CONF_PASSWORD],
-                        self._user_data[CONF_CUSTOMER_ID],
+                    self._api = await nestup_evn.async_create_api(
+                        self.hass, self._user_data[CONF_AREA]
                     )
 
+                    try:
+                        login_state = await self._api.login(
+                            self._user_data[CONF_AREA],
+                            self._user_data[CONF_USERNAME],
+                            self._user_data[CONF_PASSWORD],
+                            self._user_data[CONF_CUSTOMER_ID],
+                        )
+                        verify = (
+                            await self._verify_id()
+                            if login_state is CONF_SUCCESS
+                            else None
+                        )
+                    except EVNRequestError as ex:
+                        _LOGGER.warning("[EVN] Cannot reach EVN Server: %s", ex)
+                        login_state = CONF_ERR_CANNOT_CONNECT
+                    finally:
+                        # the entry creates its own client on setup
+                        await self._api.async_close()
+
                     if login_state is not CONF_SUCCESS:
                         self._errors["base"] = login_state
                     else:
-                        verify = await self._verify_id()
                         if verify is not CONF_SUCCESS:
                             self._errors["base"] = verify
                         else:
@@ -141,6 +168,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_HISTORY_START_DATE,
                     default="01-01-2025",
                 ): str,
+                vol.Optional(
+                    CONF_STORAGE_MODE,
+                    default=DEFAULT_STORAGE_MODE,
+                ): vol.In(STORAGE_MODES),
             }
         )
 
@@ -150,6 +181,62 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=self._errors,
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Start a reauth once EVN rejects the stored password."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for the new password and check it before saving."""
+
+        self._errors = {}
+        entry = self._reauth_entry
+
+        if user_input is not None:
+            # log in on a copy, the entry keeps the new session on success
+            area = dict(entry.data[CONF_AREA])
+            api = await nestup_evn.async_create_api(self.hass, area)
+
+            try:
+                login_state = await api.login(
+                    area,
+                    entry.data[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                    entry.data[CONF_CUSTOMER_ID],
+                )
+            except EVNRequestError as ex:
+                _LOGGER.warning("[EVN] Cannot reach EVN Server: %s", ex)
+                login_state = CONF_ERR_CANNOT_CONNECT
+            finally:
+                await api.async_close()
+
+            if login_state == CONF_SUCCESS:
+                self.hass.config_entries.async_update_entry(
+                    entry,
+                    data={
+                        **entry.data,
+                        CONF_AREA: area,
+                        CONF_PASSWORD: user_input[CONF_PASSWORD],
+                    },
+                )
+                await self.hass.config_entries.async_reload(entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+            self._errors["base"] = login_state
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_PASSWORD): str}),
+            description_placeholders={
+                "customer_id": entry.data[CONF_CUSTOMER_ID],
+            },
+            errors=self._errors,
+        )
+
     async def _verify_id(self) -> str:
         """Verify customer ID by requesting initial data."""
 
@@ -178,3 +265,37 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ex,
             )
             return CONF_ERR_UNKNOWN
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Change the history storage mode of an entry.
+
+    The entry reloads on save and its history is migrated to the new mode
+    on load.
+    """
+
+    def __init__(self, config_entry: config_entries.ConfigEntry):
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        current = self._entry.options.get(
+            CONF_STORAGE_MODE,
+            self._entry.data.get(CONF_STORAGE_MODE, DEFAULT_STORAGE_MODE),
+        )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_STORAGE_MODE,
+                        default=current,
+                    ): vol.In(STORAGE_MODES),
+                }
+            ),
+        )
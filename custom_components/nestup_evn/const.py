@@ -1,10 +1,14 @@
 """Constants for the EVN Data integration."""
 
-from datetime import timedelta
+from datetime import date, timedelta
 
 DEFAULT_SCAN_INTERVAL = timedelta(hours=3)
+DEFAULT_SAVE_DELAY = timedelta(minutes=1)
 
 DOMAIN = "nestup_evn"
+DATA_STORAGES = "storages"
+DATA_API = "api"
+DATA_INITIAL_UPDATE = "initial_update"
 
 CONF_DEVICE_NAME = "EVN Monitor"
 CONF_DEVICE_MODEL = "Vietnam EVN Monitor"
@@ -27,6 +31,19 @@ CONF_ERR_NOT_SUPPORTED = "not_supported"
 CONF_ERR_NO_MONITOR = "no_monitor"
 CONF_ERR_INVALID_ID = "error_ma_kh_deny"
 CONF_HISTORY_START_DATE = "history_start_date"
+CONF_STORAGE_MODE = "storage_mode"
+
+STORAGE_MODE_BINARY = "binary"
+STORAGE_MODE_JSON = "json"
+STORAGE_MODE_JOURNAL = "journal"
+STORAGE_MODE_SQLITE = "sqlite"
+STORAGE_MODES = [
+    STORAGE_MODE_BINARY,
+    STORAGE_MODE_JSON,
+    STORAGE_MODE_JOURNAL,
+    STORAGE_MODE_SQLITE,
+]
+DEFAULT_STORAGE_MODE = STORAGE_MODE_BINARY
 
 ID_ECON_TOTAL_NEW = "econ_total_new"
 ID_ECON_TOTAL_OLD = "econ_total_old"
@@ -58,3 +75,96 @@ VIETNAM_ECOST_STAGES = {
     300: 3350,
     400: 3460,
 }
+
+# Residential tariffs by effective date: (from, VAT %, {kWh floor: VND}),
+# oldest first; the last entry is the one above
+VIETNAM_ECOST_TARIFFS = [
+    (
+        date(2023, 5, 4),
+        10,
+        {0: 1728, 50: 1786, 100: 2074, 200: 2612, 300: 2919, 400: 3015},
+    ),
+    (
+        date(2023, 7, 1),
+        8,
+        {0: 1728, 50: 1786, 100: 2074, 200: 2612, 300: 2919, 400: 3015},
+    ),
+    (
+        date(2023, 11, 9),
+        8,
+        {0: 1806, 50: 1866, 100: 2167, 200: 2729, 300: 3050, 400: 3151},
+    ),
+    (
+        date(2024, 10, 11),
+        8,
+        {0: 1893, 50: 1956, 100: 2271, 200: 2860, 300: 3197, 400: 3302},
+    ),
+    (date(2025, 5, 10), VIETNAM_ECOST_VAT, VIETNAM_ECOST_STAGES),
+]
+
+# Daily backfill per area: days per request (0 = the API only returns its
+# own fixed window, fetched once), concurrent requests, and the minimum
+# seconds between two request starts
+BACKFILL_CHUNK_DAYS = {
+    "EVNHANOI": 31,
+    "EVNHCMC": 31,
+    "EVNNPC": 31,
+    "EVNCPC": 0,
+    "EVNSPC": 31,
+}
+BACKFILL_MAX_CONCURRENCY = {
+    "EVNHANOI": 2,
+    "EVNHCMC": 2,
+    "EVNNPC": 3,
+    "EVNCPC": 1,
+    "EVNSPC": 3,
+}
+BACKFILL_MIN_INTERVAL = {
+    "EVNHANOI": 1.0,
+    "EVNHCMC": 1.0,
+    "EVNNPC": 0.5,
+    "EVNCPC": 0.0,
+    "EVNSPC": 0.5,
+}
+DEFAULT_BACKFILL_CHUNK_DAYS = 31
+DEFAULT_BACKFILL_MAX_CONCURRENCY = 1
+DEFAULT_BACKFILL_MIN_INTERVAL = 1.0
+
+# Backfill retries: failed or empty chunks wait BASE * 2^(attempts - 1),
+# capped at MAX, and so do the days a partial answer lacked; days answered
+# without data EMPTY_ATTEMPTS times are cached as having none. Days newer
+# than GRACE_DAYS are never cached as empty
+BACKFILL_RETRY_BASE = timedelta(hours=1)
+BACKFILL_RETRY_MAX = timedelta(days=1)
+BACKFILL_EMPTY_ATTEMPTS = 3
+BACKFILL_EMPTY_GRACE_DAYS = 7
+
+# Most months EVN SPC returns for one TraCuuHoaDon from/to request
+EVNSPC_MONTHLY_SPAN_MAX = 12
+
+# A bill is expected this many days after its billing cycle closes; while
+# it is late the monthly sync retries once per MONTHLY_SYNC_RETRY
+MONTHLY_BILL_LAG_DAYS = 2
+MONTHLY_SYNC_RETRY = timedelta(days=1)
+
+# Login tokens are refreshed in the background this long before they
+# expire (at half their remaining lifetime when that is shorter)
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+
+# Pooled transport, one connector per EVN area shared by all its accounts.
+# Times are in seconds
+TRANSPORT_LIMIT = 20
+TRANSPORT_LIMIT_PER_HOST = 6
+TRANSPORT_KEEPALIVE = 60
+TRANSPORT_DNS_TTL = 300
+
+# Retries of transient request failures (connection errors, 429 and 5xx),
+# with exponential backoff and full jitter; a Retry-After above
+# RETRY_MAX_DELAY pauses the host instead. After BREAKER_THRESHOLD
+# consecutive failures a host is paused for BREAKER_COOLDOWN.
+# Times are in seconds
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 120
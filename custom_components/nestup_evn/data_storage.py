@@ -1,20 +1,100 @@
-import json
-import os
+import logging
 import asyncio
+import copy
+import time
+from array import array
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 
-from homeassistant.core import HomeAssistant
-from .utils import calc_ecost, parse_evnhanoi_money
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DATA_STORAGES,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_STORAGE_MODE,
+    DOMAIN,
+    EVNSPC_MONTHLY_SPAN_MAX,
+    ID_ECON_DAILY_NEW,
+    ID_TO_DATE,
+    MONTHLY_BILL_LAG_DAYS,
+    MONTHLY_SYNC_RETRY,
+)
+from .history import (
+    DailySeries,
+    NO_COST,
+    HistoryRollups,
+    Rollup,
+    cycle_bounds,
+    cycle_key,
+    parse_day_ordinal,
+)
+from .backfill import (
+    BackfillProgress,
+    BackfillState,
+    DailyRows,
+    async_backfill_daily,
+)
+from .storage_backends import (
+    Changes,
+    create_backend,
+    legacy_json,
+    load_history,
+)
+from .utils import VIETNAM_TARIFFS, calc_ecost, parse_evnhanoi_money
+
+_LOGGER = logging.getLogger(__name__)
 
-DATE_FMT = "%d-%m-%Y"
 DEFAULT_HISTORY_START_DATE = date(2025, 1, 1)
 
-def daterange(start: date, end: date):
-    d = start
-    while d <= end:
-        yield d
-        d += timedelta(days=1)
+
+# ----------------------------------------------------------------------
+# SHARED REGISTRY
+# ----------------------------------------------------------------------
+def get_storage(
+    hass: HomeAssistant, customer_id: str
+) -> Optional["EVNDataStorage"]:
+    """Return the shared storage of a customer, None if not set up."""
+    return hass.data.get(DOMAIN, {}).get(DATA_STORAGES, {}).get(customer_id)
+
+
+async def async_get_storage(
+    hass: HomeAssistant,
+    customer_id: str,
+    history_start_date: Optional[date] = None,
+    storage_mode: str = DEFAULT_STORAGE_MODE,
+    monthly_start: Optional[int] = None,
+) -> "EVNDataStorage":
+    """Return the loaded storage of a customer, creating it on first use.
+
+    Sensor, views and backfill all share this instance, so reads are
+    served from memory and there is a single writer per history file.
+    """
+    storages = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_STORAGES, {})
+
+    storage = storages.get(customer_id)
+    if storage is None:
+        storage = EVNDataStorage(
+            hass,
+            customer_id,
+            history_start_date=history_start_date,
+            storage_mode=storage_mode,
+            monthly_start=monthly_start,
+        )
+        storages[customer_id] = storage
+
+    await storage.async_load()
+    return storage
+
+
+async def async_release_storage(hass: HomeAssistant, customer_id: str):
+    """Flush pending changes and drop a customer's storage."""
+    storages = hass.data.get(DOMAIN, {}).get(DATA_STORAGES, {})
+    storage = storages.pop(customer_id, None)
+    if storage is not None:
+        await storage.async_cancel_backfill()
+        await storage.async_flush()
 
 
 class EVNDataStorage:
@@ -23,324 +103,378 @@ class EVNDataStorage:
         hass: HomeAssistant,
         customer_id: str,
         history_start_date: Optional[date] = None,
+        save_delay: timedelta = DEFAULT_SAVE_DELAY,
+        storage_mode: str = DEFAULT_STORAGE_MODE,
+        monthly_start: Optional[int] = None,
     ):
         self.hass = hass
         self.customer_id = customer_id
 
         self.storage_dir = hass.config.path("nestup_evn")
-        os.makedirs(self.storage_dir, exist_ok=True)
-
-        self.file_path = os.path.join(
-            self.storage_dir, f"{customer_id}.json"
+        self._backend = create_backend(
+            storage_mode, self.storage_dir, customer_id
         )
+        self.file_path = self._backend.file_path
 
-        self._lock = asyncio.Lock()
+        self._load_lock = asyncio.Lock()
+
+        # write-behind: changes bump _revision, a delayed flush persists them
+        self._save_delay = save_delay
+        self._save_lock = asyncio.Lock()
+        self._revision = 0
+        self._saved_revision = 0
+        self._unsub_save = None
+        self._unsub_final_write = None
+
+        # records added or changed since the last flush, for append-only
+        # backends; _full_write forces a complete rewrite instead
+        self._changes: Changes = []
+        self._full_write = False
+        self._meta_changed = False
 
         self.history_start_date = (
             history_start_date or DEFAULT_HISTORY_START_DATE
         )
 
-        # load once
-        self.data: Dict = self._load()
-        self.data.setdefault("daily", [])
-        self.data.setdefault("monthly", [])
+        # no I/O here, call async_load() before use; daily history lives in
+        # self.daily, self.data keeps monthly records and meta
+        self.data: Dict = {"monthly": [], "meta": {}}
+        self.daily = DailySeries()
+        self.backfill = BackfillState(self.data["meta"])
+        self._loaded = False
 
-        self.save()
+        # at most one backfill task per customer
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._backfill_progress = BackfillProgress()
 
-    # ------------------------------------------------------------------
-    # BASIC STORAGE
-    # ------------------------------------------------------------------
-    def _load(self) -> Dict:
-        if not os.path.exists(self.file_path):
-            return {}
-        try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-
-    def save(self):
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+        # billing cycle start day, 1 means calendar months
+        self.monthly_start = monthly_start or 1
+        self.rollups = HistoryRollups(self.monthly_start)
 
-    async def async_load(self):
-        return
+        # cycles whose daily costs must be recomputed before the next save
+        self._unpriced_cycles = set()
 
     # ------------------------------------------------------------------
-    # DAILY REALTIME UPDATE (từ sensor)
+    # ASYNC STORAGE
     # ------------------------------------------------------------------
-    async def async_update_from_sensor_data(self, data: dict):
-        try:
-            to_date = data.get("to_date")
-            kwh = data.get("econ_daily_new")
+    async def async_load(self):
+        if self._loaded:
+            return
 
-            if not to_date or kwh is None:
+        async with self._load_lock:
+            if self._loaded:
                 return
 
-            record = {
-                "Ngày": (
-                    to_date.strftime(DATE_FMT)
-                    if hasattr(to_date, "strftime")
-                    else str(to_date)
-                ),
-                "Điện tiêu thụ (kWh)": float(kwh),
-                "Tiền điện (VND)": None,
-            }
+            data, daily = await self.hass.async_add_executor_job(self._load)
+
+            self.data = data
+            self.daily = daily
+            self.backfill = BackfillState(data["meta"])
+            self.rollups = HistoryRollups.from_series(daily, self.monthly_start)
+            self._dedupe_monthly()
+            self._loaded = True
+
+            # histories written before costs were stored are priced and
+            # rewritten once
+            self._unpriced_cycles.update(
+                cycle_key(date.fromordinal(ordinal), self.monthly_start)
+                for ordinal, cost in zip(daily.days, daily.cost)
+                if cost == NO_COST
+            )
+            if self._unpriced_cycles:
+                self._price_cycles()
+                self._full_write = True
+                self.async_schedule_save()
+
+    def _load(self) -> Tuple[Dict, DailySeries]:
+        data, daily = load_history(self._backend)
+        data.setdefault("monthly", [])
+        data.setdefault("meta", {})
+        return data, daily
+
+    def async_schedule_save(self, meta: bool = False):
+        """Mark storage dirty and flush it once the save delay has passed.
+
+        Pass meta=True when self.data["meta"] changed, so append-only
+        backends log it along with the changed records.
+        """
+        self._revision += 1
+        self._meta_changed = self._meta_changed or meta
 
-            self._add_daily_record(record)
-            self.save()
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            )
 
-        except Exception:
-            pass
+        if self._unsub_save is None:
+            self._unsub_save = async_call_later(
+                self.hass, self._save_delay, self._async_delayed_save
+            )
 
-    # ------------------------------------------------------------------
-    # DAILY HELPERS
-    # ------------------------------------------------------------------
-    def _existing_daily_dates(self) -> set:
-        out = set()
-        for d in self.data.get("daily", []):
-            try:
-                out.add(
-                    datetime.strptime(d["Ngày"], DATE_FMT).date()
-                )
-            except Exception:
-                continue
-        return out
+    async def _async_delayed_save(self, _now):
+        self._unsub_save = None
+        await self.async_flush()
 
-    def _add_daily_record(self, record: Dict):
-        try:
-            d = datetime.strptime(record["Ngày"], DATE_FMT).date()
-        except Exception:
-            return
+    async def _async_final_write(self, _event: Event):
+        self._unsub_final_write = None
+        await self.async_flush()
 
-        if d in self._existing_daily_dates():
-            return
+    async def async_flush(self):
+        """Write pending changes now, skipping the write if nothing changed."""
+        if self._unsub_save is not None:
+            self._unsub_save()
+            self._unsub_save = None
 
-        self.data["daily"].append(record)
-        self.data["daily"].sort(
-            key=lambda x: datetime.strptime(x["Ngày"], DATE_FMT)
-        )
+        async with self._save_lock:
+            revision = self._revision
+            if revision == self._saved_revision:
+                return
 
-    def get_missing_daily_ranges(self) -> List[Tuple[date, date]]:
-        today = date.today() - timedelta(days=1)
+            snapshot = self._snapshot()
+            daily = self.daily.copy()
+            changes = None if self._full_write else self._changes
+            if changes is not None and self._meta_changed:
+                changes.append(("meta", snapshot["meta"]))
+            self._changes = []
+            self._full_write = False
+            self._meta_changed = False
 
-        if self.history_start_date > today:
-            return []
+            try:
+                await self.hass.async_add_executor_job(
+                    self._backend.write, snapshot, daily, changes
+                )
+            except Exception as ex:
+                _LOGGER.error(
+                    "[EVN] Cannot write history file %s: %s", self.file_path, ex
+                )
+                # a partial append may have happened, rewrite everything
+                self._full_write = True
+                if self._unsub_save is None:
+                    self._unsub_save = async_call_later(
+                        self.hass, self._save_delay, self._async_delayed_save
+                    )
+                return
 
-        existing = self._existing_daily_dates()
-        if not existing:
-            return [(self.history_start_date, today)]
+            self._saved_revision = revision
 
-        missing = []
-        start = None
+        if (
+            self._revision == self._saved_revision
+            and self._unsub_final_write is not None
+        ):
+            self._unsub_final_write()
+            self._unsub_final_write = None
 
-        for d in daterange(self.history_start_date, today):
-            if d not in existing:
-                start = start or d
-            else:
-                if start:
-                    missing.append((start, d - timedelta(days=1)))
-                    start = None
+    def _snapshot(self) -> Dict:
+        """Copy of self.data the executor can read while it keeps changing.
 
-        if start:
-            missing.append((start, today))
+        Monthly records are never mutated in place, so copying the list is
+        enough; meta is small and nested, so it is copied deeply.
+        """
+        return {
+            k: (list(v) if isinstance(v, list) else copy.deepcopy(v))
+            for k, v in self.data.items()
+        }
 
-        return missing
+    async def async_export_json(self) -> bytes:
+        """The history in the legacy JSON layout, encoded from memory."""
+        return await self.hass.async_add_executor_job(
+            legacy_json, self._snapshot(), self.daily.copy()
+        )
 
     # ------------------------------------------------------------------
-    # DAILY BACKFILL
+    # DAILY REALTIME UPDATE (từ sensor)
     # ------------------------------------------------------------------
-    def start_background_backfill(self, api):
-        self.hass.async_create_task(
-            self._async_run_daily_backfill(api)
-        )
-
-    async def _async_run_daily_backfill(self, api):
-        async with self._lock:
-            for start, end in self.get_missing_daily_ranges():
-                if start > end:
-                    continue
-
-                updated = False
-
-                # ===============================
-                # EVN SPC
-                # ===============================
-                if api._evn_area.get("name") == "EVNSPC":
-                    daily_raw = await api.fetch_daily_range_evnspc(
-                        self.customer_id,
-                        start.strftime("%d-%m-%Y"),
-                        end.strftime("%d-%m-%Y"),
-                    )
-
-                    if isinstance(daily_raw, list):
-                        for d in daily_raw:
-                            if not d.get("strTime"):
-                                continue
-                            try:
-                                d_date = datetime.strptime(
-                                    d["strTime"], "%d/%m/%Y"
-                                ).date()
-                            except Exception:
-                                continue
-
-                            if not (start <= d_date <= end):
-                                continue
-
-                            record = {
-                                "Ngày": d["strTime"].replace("/", "-"),
-                                "Điện tiêu thụ (kWh)": float(
-                                    d.get("dSanLuongBT") or 0
-                                ),
-                                "Tiền điện (VND)": None,
-                            }
-                            self._add_daily_record(record)
-                            updated = True
-
-                # ===============================
-                # EVN NPC
-                # ===============================
-                elif api._evn_area.get("name") == "EVNNPC":
-                    daily_raw = await api.fetch_daily_range_evnnpc(
-                        self.customer_id,
-                        start,
-                        end,
-                    )
-
-                    if isinstance(daily_raw, list):
-                        for d in daily_raw:
-                            if not d.get("NGAY"):
-                                continue
-                            try:
-                                d_date = datetime.strptime(
-                                    d["NGAY"], "%d/%m/%Y"
-                                ).date()
-                            except Exception:
-                                continue
-
-                            if not (start <= d_date <= end):
-                                continue
-
-                            record = {
-                                "Ngày": d["NGAY"].replace("/", "-"),
-                                "Điện tiêu thụ (kWh)": float(
-                                    d.get("DIEN_TTHU") or 0
-                                ),
-                                "Tiền điện (VND)": None,
-                            }
-                            self._add_daily_record(record)
-                            updated = True
-
-                # ===============================
-                # EVN CPC
-                # ===============================
-                elif api._evn_area.get("name") == "EVNCPC":
-                    daily_raw = await api.fetch_daily_range_evncpc(self.customer_id)
-
-                    if not isinstance(daily_raw, list):
-                        continue
-
-                    for d in daily_raw:
-                        ngay = d.get("ngay")
-                        kwh = d.get("sanLuongNgay")
-
-                        if not ngay or kwh is None:
-                            continue
-
-                        record = {
-                            "Ngày": datetime.fromisoformat(
-                                ngay.replace("Z", "")
-                            ).strftime(DATE_FMT),
-                            "Điện tiêu thụ (kWh)": float(kwh),
-                            "Tiền điện (VND)": None,
-                        }
-
-                        self._add_daily_record(record)
-                        updated = True
+    async def async_update_from_sensor_data(self, data: dict):
+        """Store the days carried by a regular update response.
 
-                # ===============================
-                # EVN HCMC
-                # ===============================
-                elif api._evn_area.get("name") == "EVNHCMC":
-                    daily_raw = await api.fetch_daily_range_evnhcmc(
-                        self.customer_id,
-                        start.strftime("%d/%m/%Y"),
-                        end.strftime("%d/%m/%Y"),
-                    )
+        Most areas return the whole billing period day by day, which is
+        merged in one go so recent days never need a backfill request.
+        Otherwise only the latest day is stored. Today is never stored,
+        it is still being metered.
+        """
+        try:
+            today = date.today().toordinal()
+            rows = [
+                (ordinal, kwh)
+                for ordinal, kwh in data.get("daily_series") or ()
+                if ordinal < today
+            ]
+
+            if not rows:
+                to_date = (data.get(ID_TO_DATE) or {}).get("value")
+                kwh = (data.get(ID_ECON_DAILY_NEW) or {}).get("value")
+                if not to_date or kwh is None:
+                    return
+                ordinal = parse_day_ordinal(to_date)
+                if ordinal is None or ordinal >= today:
+                    return
+                rows = [(ordinal, float(kwh))]
+
+            added = self.merge_daily(rows)
+            if added:
+                _LOGGER.debug(
+                    "[EVN] Stored %d days from update for %s",
+                    added,
+                    self.customer_id,
+                )
 
-                    if isinstance(daily_raw, list):
-                        for d in daily_raw:
-                            ngay = d.get("ngayFull")
-                            kwh = d.get("Tong")
+        except Exception as ex:
+            _LOGGER.warning(
+                "[EVN] Cannot store update data for %s: %s",
+                self.customer_id,
+                ex,
+            )
 
-                            if not ngay or kwh is None:
-                                continue
+    # ------------------------------------------------------------------
+    # DAILY HELPERS
+    # ------------------------------------------------------------------
+    def _add_daily(self, day, kwh: float, cost: Optional[int] = None) -> bool:
+        ordinal = day if isinstance(day, int) else day.toordinal()
+        if not self.daily.insert(ordinal, kwh, cost):
+            return False
+        self.rollups.add(ordinal, float(kwh))
+        self._unpriced_cycles.add(
+            cycle_key(date.fromordinal(ordinal), self.monthly_start)
+        )
+        return True
 
-                            record = {
-                                "Ngày": ngay.replace("/", "-"),
-                                "Điện tiêu thụ (kWh)": float(kwh),
-                                "Tiền điện (VND)": None,
-                            }
+    def _price_cycles(self) -> List[int]:
+        """Recompute daily costs of touched cycles, returns the repriced days.
 
-                            self._add_daily_record(record)
-                            updated = True
+        A day costs its step in the cumulative cost of its billing cycle,
+        so inserting a day reprices the later days of the same cycle.
+        """
+        repriced = []
+        daily = self.daily
+        for key in self._unpriced_cycles:
+            lo, hi = daily.span(*cycle_bounds(key, self.monthly_start))
+            costs = VIETNAM_TARIFFS.marginal_costs(
+                daily.days[lo:hi], daily.kwh[lo:hi]
+            )
+            old = daily.cost[lo:hi]
+            if costs == old.tolist():
+                continue
+            repriced.extend(
+                daily.days[pos]
+                for pos, (new, prev) in enumerate(zip(costs, old), lo)
+                if new != prev
+            )
+            daily.cost[lo:hi] = array("q", costs)
+        self._unpriced_cycles.clear()
+        return repriced
 
-                # ===============================
-                # EVN HANOI
-                # ===============================
-                elif api._evn_area.get("name") == "EVNHANOI":
-                    fetch_start = start - timedelta(days=1)
+    def get_missing_daily_ranges(self) -> List[Tuple[date, date]]:
+        today = date.today() - timedelta(days=1)
 
-                    raw = await api.fetch_daily_range_evnhanoi(
-                        self.customer_id, fetch_start, end
-                    )
+        if self.history_start_date > today:
+            return []
 
-                    if not isinstance(raw, list):
-                        continue
+        # days the server is known to have no data for count as stored
+        covered = self.daily.runs
+        if len(self.backfill.empty):
+            covered = covered.copy()
+            for lo, hi in self.backfill.empty:
+                covered.add(lo, hi)
+
+        return [
+            (date.fromordinal(lo), date.fromordinal(hi))
+            for lo, hi in covered.gaps(
+                self.history_start_date.toordinal(), today.toordinal()
+            )
+        ]
 
-                    parsed = []
-                    for d in raw:
-                        s = d.get("ngayShort") or d.get("ngay")
-                        chi_so = d.get("chiSo")
-                        if not s or chi_so is None:
-                            continue
-                        try:
-                            parsed.append((
-                                datetime.strptime(s, "%d/%m/%Y").date(),
-                                float(chi_so),
-                            ))
-                        except Exception:
-                            continue
+    # ------------------------------------------------------------------
+    # DAILY BACKFILL
+    # ------------------------------------------------------------------
+    def start_background_backfill(self, api):
+        """Start the backfill task unless one is already running.
 
-                    if len(parsed) < 2:
-                        continue
+        Triggers while it runs are dropped: the running task already
+        covers every gap that existed when it started, and the next
+        update picks up anything newer.
+        """
+        if self._backfill_task is not None and not self._backfill_task.done():
+            _LOGGER.debug(
+                "[EVN] Backfill already running for %s", self.customer_id
+            )
+            return
 
-                    parsed.sort(key=lambda x: x[0])
+        self._backfill_task = self.hass.async_create_background_task(
+            self._async_run_daily_backfill(api),
+            f"{DOMAIN} backfill {self.customer_id}",
+        )
 
-                    prev_date, prev_index = parsed[0]
+    async def _async_run_daily_backfill(self, api):
+        self._backfill_progress.start()
+        try:
+            await async_backfill_daily(self, api, self._backfill_progress)
+        except Exception as ex:
+            _LOGGER.error(
+                "[EVN] Backfill failed for %s: %s", self.customer_id, ex
+            )
+        finally:
+            self._backfill_progress.stop()
 
-                    for cur_date, cur_index in parsed[1:]:
-                        kwh = max(0.0, cur_index - prev_index)
+    async def async_cancel_backfill(self):
+        """Cancel the running backfill task and wait for it to finish."""
+        task, self._backfill_task = self._backfill_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
-                        if prev_date and start <= prev_date <= end:
-                            record = {
-                                "Ngày": prev_date.strftime(DATE_FMT),
-                                "Điện tiêu thụ (kWh)": round(kwh, 3),
-                                "Tiền điện (VND)": None,
-                            }
-                            self._add_daily_record(record)
-                            updated = True
-                        prev_date, prev_index = cur_date, cur_index
+    @property
+    def backfill_progress(self) -> Dict:
+        return {
+            **self._backfill_progress.as_dict(),
+            "backfill_done": self.backfill.done,
+            "missing_days": sum(
+                (end - start).days + 1
+                for start, end in self.get_missing_daily_ranges()
+            ),
+        }
 
-                if updated:
-                    self.save()
+    def merge_daily(self, rows: DailyRows) -> int:
+        """Insert fetched (ordinal, kWh) rows, returns the number added."""
+        added = [ordinal for ordinal, kwh in rows if self._add_daily(ordinal, kwh)]
+        if not added:
+            return 0
+
+        # new days go out priced, together with the days they repriced, so
+        # append-only backends write them as upserts
+        daily = self.daily
+        for ordinal in sorted(set(added).union(self._price_cycles())):
+            self._changes.append(
+                ("daily", daily.record(daily.span(ordinal, ordinal)[0]))
+            )
+        self.async_schedule_save()
+        return len(added)
 
     # ------------------------------------------------------------------
     # MONTHLY HELPERS
     # ------------------------------------------------------------------
+    def _add_monthly_record(self, record: Dict):
+        self.data["monthly"].append(record)
+        self._changes.append(("monthly", record))
+
+    def _dedupe_monthly(self):
+        """Keep the first record per month, ordered by (year, month)."""
+        seen = set()
+        monthly = []
+        for r in self.data.get("monthly", []):
+            k = self._monthly_record_key(record=r)
+            if k in seen:
+                continue
+            if k:
+                seen.add(k)
+            monthly.append(r)
+
+        monthly.sort(key=lambda x: (x.get("Năm") or 0, x.get("Tháng") or 0))
+        self.data["monthly"] = monthly
+
     def _monthly_record_key(
         self,
         record: dict | None = None,
@@ -378,10 +512,81 @@ class EVNDataStorage:
                 keys.add(k)
         return keys
 
+    def _missing_month_spans(
+        self, first: int, last: int, existing_keys: set, max_months: int
+    ) -> List[Tuple[int, int]]:
+        """Contiguous runs of months without a record, as (lo, hi) month
+        indexes (year * 12 + month - 1), split every max_months months."""
+        spans = []
+        for index in range(first, last + 1):
+            key = self._monthly_record_key(
+                year=index // 12, month=index % 12 + 1
+            )
+            if key in existing_keys:
+                continue
+            if spans and spans[-1][1] == index - 1 and (
+                index - spans[-1][0] < max_months
+            ):
+                spans[-1][1] = index
+            else:
+                spans.append([index, index])
+        return [(lo, hi) for lo, hi in spans]
+
     # ------------------------------------------------------------------
     # MONTHLY SYNC
     # ------------------------------------------------------------------
+    def _expected_bill_month(self, today: date) -> int:
+        """Month index of the latest bill that should be issued by today."""
+        index = today.year * 12 + today.month - 1
+        while True:
+            cycle_end = date.fromordinal(
+                cycle_bounds((index // 12, index % 12 + 1), self.monthly_start)[1]
+            )
+            if cycle_end + timedelta(days=1 + MONTHLY_BILL_LAG_DAYS) <= today:
+                return index
+            index -= 1
+
     async def async_sync_monthly_history(self, api):
+        """Fetch bills only when a bill not stored yet should be out.
+
+        Issued bills never change, so once the latest expected month is
+        stored nothing is requested until the next billing cycle closes.
+        A late bill or a failed fetch is retried once per MONTHLY_SYNC_RETRY.
+        """
+        sync = self.data["meta"].setdefault("monthly_sync", {})
+        expected = self._expected_bill_month(date.today())
+
+        if sync.get("synced_through", -1) >= expected:
+            return
+        if time.time() < sync.get("next_retry", 0):
+            return
+
+        try:
+            await self._async_fetch_monthly_history(api)
+        except Exception:
+            sync["next_retry"] = time.time() + MONTHLY_SYNC_RETRY.total_seconds()
+            self.async_schedule_save(meta=True)
+            raise
+
+        expected_key = self._monthly_record_key(
+            year=expected // 12, month=expected % 12 + 1
+        )
+        if expected_key in self._existing_monthly_keys():
+            sync["synced_through"] = expected
+            sync.pop("next_retry", None)
+            next_end = cycle_bounds(
+                ((expected + 1) // 12, (expected + 1) % 12 + 1),
+                self.monthly_start,
+            )[1]
+            sync["next_due"] = date.fromordinal(
+                next_end + 1 + MONTHLY_BILL_LAG_DAYS
+            ).isoformat()
+        else:
+            sync["next_retry"] = time.time() + MONTHLY_SYNC_RETRY.total_seconds()
+
+        self.async_schedule_save(meta=True)
+
+    async def _async_fetch_monthly_history(self, api):
         existing_keys = self._existing_monthly_keys()
         updated = False
 
@@ -389,46 +594,36 @@ class EVNDataStorage:
         # EVN SPC
         # ===============================
         if api._evn_area.get("name") == "EVNSPC":
-            today = date.today()
-            end_year = today.year
-            end_month = today.month - 1 or 12
-
-            y, m = (
-                self.history_start_date.year,
-                self.history_start_date.month,
-            )
-
-            while (y, m) <= (end_year, end_month):
-                record = {
-                    "Tháng": m,
-                    "Năm": y,
-                }
-                key = self._monthly_record_key(record)
+            start = self.history_start_date
+            first = start.year * 12 + start.month - 1
+            last = self._expected_bill_month(date.today())
+
+            for lo, hi in self._missing_month_spans(
+                first, last, existing_keys, EVNSPC_MONTHLY_SPAN_MAX
+            ):
+                bills = await api.fetch_monthly_bills_evnspc(
+                    self.customer_id,
+                    lo % 12 + 1,
+                    lo // 12,
+                    hi % 12 + 1,
+                    hi // 12,
+                )
 
-                if key not in existing_keys:
-                    bills = await api.fetch_monthly_bills_evnspc(
-                        self.customer_id, m, y, m, y
-                    )
+                if not isinstance(bills, list):
+                    continue
 
-                    if isinstance(bills, list):
-                        for b in bills:
-                            record = {
-                                "Tháng": b.get("iThang"),
-                                "Năm": b.get("iNam"),
-                                "Điện tiêu thụ (KWh)": b.get("dSanLuong"),
-                                "Tiền Điện": b.get("lTongTien"),
-                            }
-                            k = self._monthly_record_key(record)
-                            if k and k not in existing_keys:
-                                self.data["monthly"].append(record)
-                                existing_keys.add(k)
-                                updated = True
-
-                if m == 12:
-                    y += 1
-                    m = 1
-                else:
-                    m += 1
+                for b in bills:
+                    record = {
+                        "Tháng": b.get("iThang"),
+                        "Năm": b.get("iNam"),
+                        "Điện tiêu thụ (KWh)": b.get("dSanLuong"),
+                        "Tiền Điện": b.get("lTongTien"),
+                    }
+                    k = self._monthly_record_key(record)
+                    if k and k not in existing_keys:
+                        self._add_monthly_record(record)
+                        existing_keys.add(k)
+                        updated = True
 
         # ===============================
         # EVN NPC
@@ -469,10 +664,10 @@ class EVNDataStorage:
                     "Tháng": month,
                     "Năm": year,
                     "Điện tiêu thụ (KWh)": float(kwh),
-                    "Tiền Điện": calc_ecost(float(kwh)),
+                    "Tiền Điện": calc_ecost(float(kwh), date(year, month, 1)),
                 }
 
-                self.data["monthly"].append(record)
+                self._add_monthly_record(record)
                 existing_keys.add(key)
                 updated = True
 
@@ -520,7 +715,7 @@ class EVNDataStorage:
                     "Tiền Điện": cost,
                 }
 
-                self.data["monthly"].append(record)
+                self._add_monthly_record(record)
                 existing_keys.add(key)
                 updated = True
 
@@ -528,7 +723,7 @@ class EVNDataStorage:
                 self.data["monthly"].sort(
                     key=lambda x: (x.get("Năm"), x.get("Tháng"))
                 )
-                self.save()
+                self.async_schedule_save()
 
 
         # ===============================
@@ -559,7 +754,7 @@ class EVNDataStorage:
                     "Tiền Điện": int(cost),
                 }
 
-                self.data["monthly"].append(record)
+                self._add_monthly_record(record)
                 existing_keys.add(key)
                 updated = True
 
@@ -596,7 +791,7 @@ class EVNDataStorage:
                     "Tiền Điện": cost,
                 }
 
-                self.data["monthly"].append(record)
+                self._add_monthly_record(record)
                 existing_keys.add(key)
                 updated = True
        
@@ -604,22 +799,13 @@ class EVNDataStorage:
             self.data["monthly"].sort(
                 key=lambda x: (x.get("Năm"), x.get("Tháng"))
             )
-            self.save()
+            self.async_schedule_save()
 
     # ------------------------------------------------------------------
     # WEB UI EXPORT
     # ------------------------------------------------------------------
     def get_data_for_webui(self) -> Dict:
-        daily_out = [
-            {
-                "Ngày": d.get("Ngày"),
-                "Điện tiêu thụ (kWh)": float(
-                    d.get("Điện tiêu thụ (kWh)") or 0
-                ),
-                "Tiền điện (VND)": d.get("Tiền điện (VND)"),
-            }
-            for d in self.data.get("daily", [])
-        ]
+        daily_out = self.daily.records()
 
         monthly_sanluong = []
         monthly_tiendien = []
@@ -655,3 +841,50 @@ class EVNDataStorage:
                 "TienDien": monthly_tiendien,
             },
         }
+
+    def get_summary(self) -> Dict:
+        """Monthly, yearly and billing-cycle rollups of the daily history.
+
+        Costs are tiered per month/cycle on its kWh total, with the tariff
+        in effect on its last day; a year costs the sum of its months.
+        """
+        rollups = self.rollups
+        cycle_start = rollups.cycle_start
+
+        def period_cost(key: Tuple[int, int], rollup: Rollup, start: int):
+            last_day = date.fromordinal(cycle_bounds(key, start)[1])
+            return calc_ecost(rollup.kwh, last_day)
+
+        def row(rollup: Rollup, cost: int, **key) -> Dict:
+            return {
+                **key,
+                "kwh": round(rollup.kwh, 3),
+                "min": round(rollup.min, 3),
+                "max": round(rollup.max, 3),
+                "mean": round(rollup.mean, 3),
+                "days": rollup.days,
+                "cost": cost,
+            }
+
+        month_costs = {
+            key: period_cost(key, r, 1) for key, r in rollups.months.items()
+        }
+        year_costs: Dict[int, int] = {}
+        for (year, _), cost in month_costs.items():
+            year_costs[year] = year_costs.get(year, 0) + cost
+
+        return {
+            "cycle_start": cycle_start,
+            "monthly": [
+                row(r, month_costs[(y, m)], year=y, month=m)
+                for (y, m), r in sorted(rollups.months.items())
+            ],
+            "yearly": [
+                row(r, year_costs[y], year=y)
+                for y, r in sorted(rollups.years.items())
+            ],
+            "cycles": [
+                row(r, period_cost((y, m), r, cycle_start), year=y, month=m)
+                for (y, m), r in sorted(rollups.cycles.items())
+            ],
+        }
@@ -0,0 +1,296 @@
+"""In-memory daily history model shared by EVNDataStorage and its backends."""
+
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+DATE_FMT = "%d-%m-%Y"
+
+
+def parse_day_ordinal(value: str) -> Optional[int]:
+    """Convert a DD-MM-YYYY (or DD/MM/YYYY) string to a date ordinal."""
+    try:
+        day, month, year = value.replace("/", "-").split("-")
+        return date(int(year), int(month), int(day)).toordinal()
+    except Exception:
+        return None
+
+
+NO_COST = -1
+
+
+def parse_daily_record(record: Dict) -> Optional[Tuple[int, float, int]]:
+    """(ordinal, kWh, cost) of a legacy daily dict, None if its date is invalid."""
+    ordinal = parse_day_ordinal(str(record.get("Ngày")))
+    if ordinal is None:
+        return None
+    try:
+        kwh = float(record.get("Điện tiêu thụ (kWh)") or 0)
+    except (TypeError, ValueError):
+        kwh = 0.0
+    try:
+        cost = int(record.get("Tiền điện (VND)"))
+    except (TypeError, ValueError):
+        cost = NO_COST
+    return ordinal, kwh, cost
+
+
+class DayIntervals:
+    """Sorted, non-overlapping closed ranges of date ordinals.
+
+    Adjacent and overlapping ranges are merged on insert, so the size of the
+    set is the number of runs, not the number of days.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def __contains__(self, ordinal: int) -> bool:
+        i = bisect_right(self.starts, ordinal) - 1
+        return i >= 0 and self.ends[i] >= ordinal
+
+    def add(self, lo: int, hi: Optional[int] = None):
+        hi = lo if hi is None else hi
+
+        # every run touching [lo - 1, hi + 1] collapses into one
+        i = bisect_left(self.ends, lo - 1)
+        j = bisect_right(self.starts, hi + 1)
+        if i < j:
+            lo = min(lo, self.starts[i])
+            hi = max(hi, self.ends[j - 1])
+
+        self.starts[i:j] = [lo]
+        self.ends[i:j] = [hi]
+
+    def gaps(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Ranges inside [lo, hi] not covered by the set."""
+        out = []
+        cur = lo
+        i = bisect_left(self.ends, lo)
+        while i < len(self.starts) and self.starts[i] <= hi:
+            if self.starts[i] > cur:
+                out.append((cur, self.starts[i] - 1))
+            cur = max(cur, self.ends[i] + 1)
+            i += 1
+
+        if cur <= hi:
+            out.append((cur, hi))
+        return out
+
+    def copy(self) -> "DayIntervals":
+        other = DayIntervals()
+        other.starts = list(self.starts)
+        other.ends = list(self.ends)
+        return other
+
+
+class DailySeries:
+    """Daily history as parallel typed arrays sorted by date ordinal.
+
+    Costs use NO_COST for "not computed". Rows only become the legacy
+    {"Ngày", "Điện tiêu thụ (kWh)", "Tiền điện (VND)"} dicts at the
+    JSON/web boundary, through records().
+    """
+
+    __slots__ = ("days", "kwh", "cost", "runs")
+
+    def __init__(self):
+        self.days = array("i")
+        self.kwh = array("d")
+        self.cost = array("q")
+        # runs of consecutive stored days, kept in step with self.days
+        self.runs = DayIntervals()
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __contains__(self, ordinal: int) -> bool:
+        pos = bisect_left(self.days, ordinal)
+        return pos < len(self.days) and self.days[pos] == ordinal
+
+    def insert(self, ordinal: int, kwh: float, cost: Optional[int] = None) -> bool:
+        """Insert a day in order; existing days are left untouched."""
+        pos = bisect_left(self.days, ordinal)
+        if pos < len(self.days) and self.days[pos] == ordinal:
+            return False
+
+        self.days.insert(pos, ordinal)
+        self.kwh.insert(pos, float(kwh))
+        self.cost.insert(pos, NO_COST if cost is None else int(cost))
+        self.runs.add(ordinal)
+        return True
+
+    def upsert(self, ordinal: int, kwh: float, cost: Optional[int] = None):
+        """Insert a day, or overwrite it when it is already stored."""
+        pos = bisect_left(self.days, ordinal)
+        if pos < len(self.days) and self.days[pos] == ordinal:
+            self.kwh[pos] = float(kwh)
+            self.cost[pos] = NO_COST if cost is None else int(cost)
+        else:
+            self.insert(ordinal, kwh, cost)
+
+    def span(self, lo: int, hi: int) -> Tuple[int, int]:
+        """Slice bounds of the days inside [lo, hi]."""
+        return bisect_left(self.days, lo), bisect_right(self.days, hi)
+
+    def record(self, pos: int) -> Dict:
+        cost = self.cost[pos]
+        return {
+            "Ngày": date.fromordinal(self.days[pos]).strftime(DATE_FMT),
+            "Điện tiêu thụ (kWh)": self.kwh[pos],
+            "Tiền điện (VND)": None if cost == NO_COST else cost,
+        }
+
+    def records(self) -> List[Dict]:
+        return [self.record(pos) for pos in range(len(self.days))]
+
+    def copy(self) -> "DailySeries":
+        other = DailySeries()
+        other.days = array("i", self.days)
+        other.kwh = array("d", self.kwh)
+        other.cost = array("q", self.cost)
+        other.runs = self.runs.copy()
+        return other
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "DailySeries":
+        """Build from legacy dicts, dropping invalid rows and duplicates."""
+        rows = {}
+        for record in records:
+            parsed = parse_daily_record(record)
+            if parsed is None:
+                _LOGGER.debug("[EVN] Dropping invalid daily record %s", record)
+                continue
+            ordinal, kwh, cost = parsed
+            if ordinal in rows:
+                continue
+            rows[ordinal] = (kwh, cost)
+
+        days = sorted(rows)
+        return cls.from_columns(
+            array("i", days),
+            array("d", (rows[o][0] for o in days)),
+            array("q", (rows[o][1] for o in days)),
+        )
+
+    @classmethod
+    def from_columns(cls, days: array, kwh: array, cost: array) -> "DailySeries":
+        """Adopt already sorted, duplicate-free columns."""
+        series = cls()
+        series.days, series.kwh, series.cost = days, kwh, cost
+
+        runs = series.runs
+        for ordinal in days:
+            if runs.ends and runs.ends[-1] == ordinal - 1:
+                runs.ends[-1] = ordinal
+            else:
+                runs.starts.append(ordinal)
+                runs.ends.append(ordinal)
+        return series
+
+
+def cycle_key(day: date, cycle_start: int) -> Tuple[int, int]:
+    """(year, month) label of the billing cycle containing day.
+
+    A cycle starting on day S runs from day S of the previous month to day
+    S - 1 of the labelled month, like the web UI; S = 1 is the calendar
+    month.
+    """
+    if cycle_start <= 1 or day.day < cycle_start:
+        return day.year, day.month
+    if day.month == 12:
+        return day.year + 1, 1
+    return day.year, day.month + 1
+
+
+def cycle_bounds(key: Tuple[int, int], cycle_start: int) -> Tuple[int, int]:
+    """First and last date ordinal of the cycle labelled key."""
+    year, month = key
+    if month == 12:
+        next_first = date(year + 1, 1, 1)
+    else:
+        next_first = date(year, month + 1, 1)
+
+    if cycle_start <= 1:
+        return date(year, month, 1).toordinal(), next_first.toordinal() - 1
+
+    if month == 1:
+        lo = date(year - 1, 12, cycle_start)
+    else:
+        lo = date(year, month - 1, cycle_start)
+    return lo.toordinal(), date(year, month, cycle_start).toordinal() - 1
+
+
+class Rollup:
+    """Running kWh aggregate of one period."""
+
+    __slots__ = ("days", "kwh", "min", "max")
+
+    def __init__(self):
+        self.days = 0
+        self.kwh = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def add(self, kwh: float):
+        if self.days:
+            self.min = min(self.min, kwh)
+            self.max = max(self.max, kwh)
+        else:
+            self.min = self.max = kwh
+        self.days += 1
+        self.kwh += kwh
+
+    @property
+    def mean(self) -> float:
+        return self.kwh / self.days if self.days else 0.0
+
+
+class HistoryRollups:
+    """Per-month, per-year and per-billing-cycle rollups of a DailySeries.
+
+    Built once from the series on load, then updated in O(1) per inserted
+    day, so reading them never scans the daily history.
+    """
+
+    __slots__ = ("cycle_start", "months", "years", "cycles")
+
+    def __init__(self, cycle_start: int = 1):
+        self.cycle_start = cycle_start
+        self.months: Dict[Tuple[int, int], Rollup] = {}
+        self.years: Dict[int, Rollup] = {}
+        self.cycles: Dict[Tuple[int, int], Rollup] = {}
+
+    def add(self, ordinal: int, kwh: float):
+        day = date.fromordinal(ordinal)
+        for table, key in (
+            (self.months, (day.year, day.month)),
+            (self.years, day.year),
+            (self.cycles, cycle_key(day, self.cycle_start)),
+        ):
+            rollup = table.get(key)
+            if rollup is None:
+                rollup = table[key] = Rollup()
+            rollup.add(kwh)
+
+    @classmethod
+    def from_series(
+        cls, series: DailySeries, cycle_start: int = 1
+    ) -> "HistoryRollups":
+        rollups = cls(cycle_start)
+        for ordinal, kwh in zip(series.days, series.kwh):
+            rollups.add(ordinal, kwh)
+        return rollups
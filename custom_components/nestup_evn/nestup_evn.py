@@ -1,5 +1,6 @@
 """Setup and manage the EVN API."""
 
+import asyncio
 import base64
 from dataclasses import asdict
 from datetime import date, datetime, timedelta, timezone
@@ -7,20 +8,24 @@ import json
 import gzip
 import logging
 import os
-import ssl
 import time
 from typing import Any
 
 from dateutil import parser
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import (
-    async_create_clientsession,
-    async_get_clientsession,
-)
+from homeassistant.helpers.update_coordinator import UpdateFailed
 
+from .auth import AuthToken, get_token_manager
+from .backfill import (
+    parse_daily_rows,
+    parse_meter_rows,
+    slash_date_ordinal,
+)
 from .data_storage import EVNDataStorage
-from .const import CONF_HISTORY_START_DATE
+from .history import parse_day_ordinal
+from .retry import EVNRequestError, async_request, get_circuit_breaker
+from .transport import async_create_session
 from .utils import calc_ecost
 
 from .const import (
@@ -56,27 +61,47 @@ from .types import EVN_NAME, VIETNAM_EVN_AREA, Area
 
 _LOGGER = logging.getLogger(__name__)
 
-def create_ssl_context():
-    """Create SSL context with cipher settings"""
-    context = ssl.create_default_context()
-    context.set_ciphers("ALL:@SECLEVEL=1")
-    return context
-
 def read_evn_branches_file(file_path):
     """Read EVN branches file synchronously"""
     with open(file_path) as f:
         return json.load(f)
 
+async def async_create_api(hass: HomeAssistant, evn_area: Area) -> "EVNAPI":
+    """Create a client with its own session on the area's pooled connector"""
+    session = await async_create_session(hass, evn_area.get("name"))
+    return EVNAPI(hass, session=session)
+
+
 class EVNAPI:
-    def __init__(self, hass: HomeAssistant, is_new_session=False):
-        """Construct EVNAPI wrapper."""
+    def __init__(self, hass: HomeAssistant, session):
+        """Construct EVNAPI wrapper on a session from async_create_session."""
         self.hass = hass  # Store hass instance
-        self._session = (
-            async_create_clientsession(hass)
-            if is_new_session
-            else async_get_clientsession(hass)
-        )
+        self._owns_session = True
+        self._session = session
         self._evn_area = {}
+        self._tokens = get_token_manager(hass)
+
+    async def async_close(self):
+        """Stop token refreshes and close the session created for this client."""
+        self._tokens.release(self)
+        if self._owns_session and not self._session.closed:
+            await self._session.close()
+
+    async def _request(self, method, url, **kwargs):
+        """Send a request under the retry policy and the host's circuit breaker."""
+        return await async_request(
+            self._session,
+            get_circuit_breaker(self.hass, url),
+            method,
+            url,
+            **kwargs,
+        )
+
+    async def _get(self, url, **kwargs):
+        return await self._request("GET", url, **kwargs)
+
+    async def _post(self, url, **kwargs):
+        return await self._request("POST", url, **kwargs)
 
     async def login(self, evn_area, username, password, customer_id) -> str:
         """Try login into EVN corresponding with different EVN areas"""
@@ -103,11 +128,186 @@ class EVNAPI:
 
         return CONF_ERR_UNKNOWN
 
+    @staticmethod
+    def _token_key(evn_area: Area, username, customer_id) -> tuple:
+        # EVNNPC hands out a token per customer via its account switch,
+        # every other area one token per username
+        if evn_area.get("name") == EVN_NAME.NPC:
+            return (evn_area.get("name"), username, customer_id)
+        return (evn_area.get("name"), username)
+
+    async def async_ensure_login(
+        self,
+        evn_area: Area,
+        username,
+        password,
+        customer_id,
+        rejected: AuthToken | None = None,
+    ) -> str:
+        """Make sure the area carries a live token, logging in only if not
+
+        rejected is a session the server refused, never adopted again.
+        """
+
+        self._evn_area = evn_area
+
+        key = self._token_key(evn_area, username, customer_id)
+        token = self._tokens.get(key)
+
+        if token is None:
+            login = self._token_login(evn_area, username, password, customer_id)
+            apply = lambda new_token: new_token.apply(evn_area)
+
+            # adopt the session stored at setup while it has not expired
+            stored = AuthToken.from_area(evn_area)
+            if stored.is_valid() and not (
+                rejected is not None and stored.same_session(rejected)
+            ):
+                token = self._tokens.adopt(key, stored, login, self, apply)
+            else:
+                status, token = await self._tokens.async_login(
+                    key, login, self, apply=apply
+                )
+                if token is None:
+                    return status
+
+        token.apply(evn_area)
+        return CONF_SUCCESS
+
+    def _token_login(self, evn_area: Area, username, password, customer_id):
+        """Login function the token cache runs for this account"""
+
+        if evn_area.get("name") != EVN_NAME.NPC:
+            return lambda: self._async_login_token(
+                evn_area, username, password, customer_id
+            )
+
+        async def _async_customer_token():
+            account_key = (evn_area.get("name"), username)
+            account_login = lambda: self._async_login_token(
+                evn_area, username, password, customer_id
+            )
+
+            for _ in range(2):
+                status, account = await self._tokens.async_login(
+                    account_key, account_login, self
+                )
+                if account is None:
+                    return status, None
+                if account.customer_id == customer_id:
+                    return status, account
+
+                status, token = await self._async_switch_token(
+                    evn_area, account, customer_id
+                )
+                if status != CONF_ERR_INVALID_AUTH:
+                    return status, token
+
+                # the account token was rejected, log in once more
+                self._tokens.invalidate(account_key, account)
+
+            return status, None
+
+        return _async_customer_token
+
+    def _login_client(self, evn_area: Area) -> "EVNAPI":
+        """Client on this session whose login_* calls write to a copy of the area
+
+        Requests in flight keep reading the live area, which only changes
+        when the caller applies the token the login returns.
+        """
+
+        client = EVNAPI(self.hass, session=self._session)
+        client._owns_session = False
+        client._evn_area = dict(evn_area)
+        return client
+
+    async def _async_login_token(
+        self, evn_area: Area, username, password, customer_id
+    ) -> tuple[str, AuthToken | None]:
+        """Log in and return the new token, leaving the area untouched"""
+
+        previous = AuthToken.from_area(evn_area)
+        client = self._login_client(evn_area)
+        scratch = client._evn_area
+        AuthToken.reset(scratch)
+
+        status = None
+        if evn_area.get("name") == EVN_NAME.CPC and previous.refresh_token:
+            status = await client.refresh_evncpc(previous.refresh_token)
+
+        if status != CONF_SUCCESS:
+            if evn_area.get("name") == EVN_NAME.NPC:
+                status = await client.login_evnnpc_account(
+                    username, password, customer_id
+                )
+            else:
+                status = await client.login(scratch, username, password, customer_id)
+
+        if status != CONF_SUCCESS:
+            return status, None
+        return status, AuthToken.from_area(scratch)
+
+    async def _async_switch_token(
+        self, evn_area: Area, account: AuthToken, customer_id
+    ) -> tuple[str, AuthToken | None]:
+        """Derive the EVNNPC token of customer_id from an account token"""
+
+        client = self._login_client(evn_area)
+        account.apply(client._evn_area)
+
+        status = await client.switch_evnnpc(customer_id)
+        if status != CONF_SUCCESS:
+            return status, None
+
+        # the expiry applied above is the account token's, the customer
+        # token carries its own in the JWT
+        client._evn_area.pop("token_expiry", None)
+        client._evn_area.pop("expires", None)
+        return status, AuthToken.from_area(client._evn_area)
+
     async def request_update(
         self, evn_area: Area, username, password, customer_id, monthly_start=None
     ) -> dict[str, Any]:
         """Request new update from EVN Server, corresponding with the last session"""
 
+        login_status = await self.async_ensure_login(
+            evn_area, username, password, customer_id
+        )
+        if login_status != CONF_SUCCESS:
+            return {"status": login_status}
+
+        fetch_data = await self._request_update(
+            evn_area, username, password, customer_id, monthly_start
+        )
+
+        if fetch_data.get("status") == CONF_ERR_INVALID_AUTH:
+            # the server dropped the session before its expiry
+            _LOGGER.info("[EVN] Session rejected for %s, logging in again", customer_id)
+            rejected = AuthToken.from_area(evn_area)
+            self._tokens.invalidate(
+                self._token_key(evn_area, username, customer_id), rejected
+            )
+
+            # the area keeps the old session until the new one replaces it
+            login_status = await self.async_ensure_login(
+                evn_area, username, password, customer_id, rejected=rejected
+            )
+            if login_status != CONF_SUCCESS:
+                return {"status": login_status}
+
+            fetch_data = await self._request_update(
+                evn_area, username, password, customer_id, monthly_start
+            )
+
+        if fetch_data["status"] == CONF_SUCCESS:
+            return formatted_result(fetch_data)
+
+        return fetch_data
+
+    async def _request_update(
+        self, evn_area: Area, username, password, customer_id, monthly_start=None
+    ) -> dict[str, Any]:
         self._evn_area = evn_area
 
         fetch_data = {}        
@@ -128,10 +328,6 @@ class EVNAPI:
             )
 
         elif evn_area.get("name") == EVN_NAME.NPC:            
-            login_status = await self.login_evnnpc(username, password, customer_id)
-            if login_status != CONF_SUCCESS:
-                return {"status": login_status}
-                
             fetch_data = await self.request_update_evnnpc(
                 customer_id, from_date, to_date
             )
@@ -141,9 +337,6 @@ class EVNAPI:
                 username, password, customer_id, from_date, to_date
             )
 
-        if fetch_data["status"] == CONF_SUCCESS:
-            return formatted_result(fetch_data)
-
         return fetch_data
 
     async def login_evnhanoi(self, username, password) -> str:
@@ -163,7 +356,7 @@ class EVNAPI:
             "grant_type": "password",
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             url=self._evn_area.get("evn_login_url"), data=payload, headers=headers
         )
 
@@ -192,13 +385,10 @@ class EVNAPI:
 
         payload = {"u": username, "p": password}
 
-        ssl_context = await self.hass.async_add_executor_job(create_ssl_context)
-
-        resp = await self._session.post(
+        resp = await self._post(
             self._evn_area.get("evn_login_url"),
             data=payload,
             headers=headers,
-            ssl=ssl_context,
         )
 
         status, resp_json = await json_processing(resp)
@@ -227,6 +417,18 @@ class EVNAPI:
         return CONF_SUCCESS
 
     async def login_evnnpc(self, username, password, customer_id) -> str:
+        """Log in to EVNNPC and switch to customer_id if it is not the account's own"""
+
+        status = await self.login_evnnpc_account(username, password, customer_id)
+        if status != CONF_SUCCESS:
+            return status
+
+        if self._evn_area.get("login_customer_id") != customer_id:
+            return await self.switch_evnnpc(customer_id)
+
+        return CONF_SUCCESS
+
+    async def login_evnnpc_account(self, username, password, customer_id) -> str:
         payload = {
             "username": username,
             "password": password,
@@ -243,7 +445,7 @@ class EVNAPI:
 			"connection": "Keep-Alive",
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             self._evn_area["evn_login_url"],
             json=payload,
             headers=headers,
@@ -260,35 +462,45 @@ class EVNAPI:
         access_token = data.get("accessToken")
         user_data = data.get("data", {})
 
-        ma_kh_login = user_data.get("maKhang")
         self._evn_area["access_token"] = access_token
+        self._evn_area["login_customer_id"] = user_data.get("maKhang")
 
-        if ma_kh_login != customer_id:
-            switch_url = (
-                f"https://cskh.evn.com.vn/cskh/v1/user/switch/{customer_id}"
-            )
+        return CONF_SUCCESS
 
-            switch_headers = {
-                "accept": "application/json, text/plain, */*",
-                "accept-encoding": "gzip",
-                "connection": "Keep-Alive",
-                "user-agent": "okhttp/4.12.0",
-                "authorization": f"Bearer {access_token}",
-            }
+    async def switch_evnnpc(self, customer_id) -> str:
+        """Exchange the account token for the token of another customer"""
 
-            resp = await self._session.get(switch_url, headers=switch_headers)
-            status, switch_json = await json_processing(resp)
+        access_token = self._evn_area.get("access_token")
 
-            if status != CONF_SUCCESS:
-                return CONF_ERR_INVALID_ID
+        switch_url = (
+            f"https://cskh.evn.com.vn/cskh/v1/user/switch/{customer_id}"
+        )
 
-            switch_data = switch_json.get("data", {})
-            new_token = switch_data.get("accessToken")
+        switch_headers = {
+            "accept": "application/json, text/plain, */*",
+            "accept-encoding": "gzip",
+            "connection": "Keep-Alive",
+            "user-agent": "okhttp/4.12.0",
+            "authorization": f"Bearer {access_token}",
+        }
 
-            if not new_token:
-                return CONF_ERR_INVALID_ID
+        resp = await self._get(switch_url, headers=switch_headers)
+        status, switch_json = await json_processing(resp)
 
-            self._evn_area["access_token"] = new_token
+        if status == CONF_ERR_INVALID_AUTH:
+            return status
+
+        if status != CONF_SUCCESS:
+            return CONF_ERR_INVALID_ID
+
+        switch_data = switch_json.get("data", {})
+        new_token = switch_data.get("accessToken")
+
+        if not new_token:
+            return CONF_ERR_INVALID_ID
+
+        self._evn_area["access_token"] = new_token
+        self._evn_area["login_customer_id"] = customer_id
 
         return CONF_SUCCESS
 
@@ -312,7 +524,7 @@ class EVNAPI:
             "User-Agent": "okhttp/4.9.2",
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             self._evn_area["evn_login_url"], data=payload, headers=headers
         )
 
@@ -322,12 +534,47 @@ class EVNAPI:
             return CONF_ERR_INVALID_AUTH
 
         if resp_json.get("access_token"):
-            self._evn_area["access_token"] = resp_json["access_token"]
+            self._store_evncpc_token(resp_json)
             return CONF_SUCCESS
 
         _LOGGER.error(f"Error while logging in EVN Endpoints: {resp_json}")
         return CONF_ERR_UNKNOWN
 
+    async def refresh_evncpc(self, refresh_token) -> str:
+        """Renew the EVNCPC token with its refresh token"""
+
+        payload = {
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token",
+        }
+
+        basic_auth = "CSKH_Mobile_Notification:Evncpc@CC2023!Annv1609#"
+        auth_header = base64.b64encode(basic_auth.encode()).decode()
+
+        headers = {
+            "Authorization": f"Basic {auth_header}",
+            "Accept": "application/json",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "User-Agent": "okhttp/4.9.2",
+        }
+
+        resp = await self._post(
+            self._evn_area["evn_login_url"], data=payload, headers=headers
+        )
+
+        status, resp_json = await json_processing(resp)
+        if status != CONF_SUCCESS or not resp_json.get("access_token"):
+            return CONF_ERR_INVALID_AUTH
+
+        self._store_evncpc_token(resp_json)
+        return CONF_SUCCESS
+
+    def _store_evncpc_token(self, resp_json):
+        self._evn_area["access_token"] = resp_json["access_token"]
+        self._evn_area["refresh_token"] = resp_json.get("refresh_token")
+        if "expires_in" in resp_json:
+            self._evn_area["token_expiry"] = time.time() + resp_json["expires_in"]
+
     async def login_evnspc(self, username, password, customer_id) -> str:
         """Create EVN login session corresponding with EVNSPC Endpoint"""
 
@@ -345,11 +592,10 @@ class EVNAPI:
             "Content-Type": "application/json; charset=utf-8",
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             url=self._evn_area.get("evn_login_url"),
             data=json.dumps(payload),
             headers=headers,
-            ssl=False,
         )
 
         status, resp_json = await json_processing(resp)
@@ -375,11 +621,6 @@ class EVNAPI:
     ):
         """Request new update from EVNHANOI Server"""
 
-        if self.is_token_expired():
-            login_status = await self.login_evnhanoi(username, password)
-            if login_status != CONF_SUCCESS:
-                raise ConfigEntryNotReady("Token expired and failed to reauthenticate")
-                    
         headers = {
             "Authorization": f"Bearer {self._evn_area.get('access_token')}",
             "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.0.0 Safari/537.36",
@@ -387,44 +628,17 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        data = {
-            "maDiemDo": f"{customer_id}{last_index}",
-            "maDonVi": f"{customer_id[0:6]}",
-            "maXacThuc": "EVNHN",
-            "ngayDau": from_date,
-            "ngayCuoi": to_date,
-        }
-
-        ssl_context = await self.hass.async_add_executor_job(ssl.create_default_context)
-
-        resp = await self._session.post(
-            url=self._evn_area.get("evn_data_url"),
-            data=json.dumps(data),
-            headers=headers,
-            ssl=ssl_context,
+        consumption, payment = await asyncio.gather(
+            self._fetch_consumption_evnhanoi(
+                customer_id, from_date, to_date, headers, last_index
+            ),
+            self._fetch_payment_evnhanoi(customer_id, headers),
+            return_exceptions=True,
         )
 
-        status, resp_json = await json_processing(resp)
-
+        status, sub_data = required_result(consumption)
         if status != CONF_SUCCESS:
-            return resp_json
-
-        if resp_json.get("isError"):
-
-            if resp_json.get("code") == 400:
-
-                if last_index == "001":
-                    return await self.request_update_evnhanoi(
-                        username, password, customer_id, from_date, to_date, last_index="1"
-                    )
-
-                return {"status": CONF_ERR_INVALID_ID, "data": resp_json}
-
-            _LOGGER.error(f"Cannot request new data from EVN Server: {resp_json}")
-
-            return {"status": resp_json.get("code"), "data": resp_json}
-
-        sub_data = resp_json["data"]["chiSoNgay"]
+            return sub_data
 
         from_date = parser.parse(sub_data[0]["ngay"], dayfirst=True)
         to_date = parser.parse(
@@ -460,18 +674,66 @@ class EVNAPI:
             "to_date": to_date.date(),
             "from_date": from_date.date(),
             "previous_date": previous_date.date(),
+            "daily_series": parse_meter_rows(
+                sub_data, "ngay", "sg", parse_day_ordinal
+            ),
         }
 
+        fetched_data.update(
+            optional_result(payment, PAYMENT_UNKNOWN, "EVNHANOI payment data")
+        )
+
+        return fetched_data
+
+    async def _fetch_consumption_evnhanoi(
+        self, customer_id, from_date, to_date, headers, last_index="001"
+    ):
+        data = {
+            "maDiemDo": f"{customer_id}{last_index}",
+            "maDonVi": f"{customer_id[0:6]}",
+            "maXacThuc": "EVNHN",
+            "ngayDau": from_date,
+            "ngayCuoi": to_date,
+        }
+
+        resp = await self._post(
+            url=self._evn_area.get("evn_data_url"),
+            data=json.dumps(data),
+            headers=headers,
+        )
+
+        status, resp_json = await json_processing(resp)
+
+        if status != CONF_SUCCESS:
+            return status, resp_json
+
+        if resp_json.get("isError"):
+
+            if resp_json.get("code") == 400:
+
+                if last_index == "001":
+                    return await self._fetch_consumption_evnhanoi(
+                        customer_id, from_date, to_date, headers, last_index="1"
+                    )
+
+                return CONF_ERR_INVALID_ID, {"status": CONF_ERR_INVALID_ID, "data": resp_json}
+
+            _LOGGER.error(f"Cannot request new data from EVN Server: {resp_json}")
+
+            return resp_json.get("code"), {"status": resp_json.get("code"), "data": resp_json}
+
+        return CONF_SUCCESS, resp_json["data"]["chiSoNgay"]
+
+    async def _fetch_payment_evnhanoi(self, customer_id, headers) -> dict:
         data = {
             "maKhachHang": customer_id,
             "maDonViQuanLy": f"{customer_id[0:6]}",
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             url=self._evn_area.get("evn_payment_url"),
             data=json.dumps(data),
             headers=headers,
-            ssl=ssl_context,
         )
         status, resp_json = await json_processing(resp)
 
@@ -489,21 +751,13 @@ class EVNAPI:
             else:
                 payment_status = STATUS_N_PAYMENT_NEEDED
 
-        fetched_data.update(
-            {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
-        )
-
-        return fetched_data
-
-    def is_token_expired(self) -> bool:
-        expiry_time = self._evn_area.get("token_expiry", 0)
-        return time.time() > expiry_time
+        return {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
 
     async def fetch_evnhanoi_contract(self, customer_id: str):
         if hasattr(self, "_evnhanoi_contract") and self._evnhanoi_contract:
             return self._evnhanoi_contract
 
-        resp = await self._session.get(
+        resp = await self._get(
             "https://evnhanoi.vn/api/TraCuu/GetDanhSachHopDongByUserName",
             headers={
                 "Accept": "application/json",
@@ -543,7 +797,7 @@ class EVNAPI:
             "ngayCuoi": end.strftime("%d/%m/%Y"),
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             "https://evnhanoi.vn/api/TraCuu/LayChiSoDoXaPharse2",
             json=payload,
             headers={
@@ -576,7 +830,7 @@ class EVNAPI:
    
         contract = await self.fetch_evnhanoi_contract(customer_id)
 
-        resp = await self._session.get(
+        resp = await self._get(
             "https://evnhanoi.vn/api/TraCuu/GetLichSuThanhToan",
             params={
                 "maDvQly": contract["maDonViQuanLy"],
@@ -605,22 +859,6 @@ class EVNAPI:
     async def request_update_evnhcmc(self, username, password, customer_id, from_date, to_date):
         """Request new update from EVNHCMC Server"""
 
-        evn_session_expires = self._evn_area.get("expires")
-        if isinstance(evn_session_expires, datetime):
-            evn_session_expires = evn_session_expires.astimezone(timezone.utc)
-        else:    
-            evn_session_expires = None
-
-        if not evn_session_expires:
-            login_status = await self.login_evnhcmc(username, password)
-            if login_status != CONF_SUCCESS:
-                raise ConfigEntryNotReady("Failed to reauthenticate due to invalid session expiration.")
-        elif datetime.now(tz=timezone.utc) >= evn_session_expires:
-            _LOGGER.info("Session expired. Attempting to login again...")
-            login_status = await self.login_evnhcmc(username, password)
-            if login_status != CONF_SUCCESS:
-                raise ConfigEntryNotReady("Session expired and failed to reauthenticate")       
-
         headers = {
             "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.0.0 Safari/537.36",
             "Accept": "application/json",
@@ -629,36 +867,18 @@ class EVNAPI:
             "Cookie": f"evn_session={self._evn_area.get('evn_session')}",
         }
 
-        ssl_context = await self.hass.async_add_executor_job(ssl.create_default_context)
-
-        resp = await self._session.post(
-            url=self._evn_area.get("evn_data_url"),
-            data={
-                "input_makh": customer_id,
-                "input_tungay": from_date,
-                "input_denngay": to_date,
-            },
-            ssl=ssl_context,
-            headers=headers,
+        consumption, payment = await asyncio.gather(
+            self._fetch_consumption_evnhcmc(
+                customer_id, from_date, to_date, headers
+            ),
+            self._fetch_payment_evnhcmc(customer_id, headers),
+            return_exceptions=True,
         )
-        status, resp_json = await json_processing(resp)
 
+        status, resp_json = required_result(consumption)
         if status != CONF_SUCCESS:
             return resp_json
 
-        state = resp_json["state"]
-
-        if state != CONF_SUCCESS:
-            if state == "error_login":
-                return {"status": CONF_ERR_INVALID_AUTH, "data": resp.status}
-
-            _LOGGER.error(
-                f"Cannot request new data from EVN Server for customer ID: {customer_id}\n{resp_json}"
-            )
-            return {"status": state, "data": resp_json}
-
-        resp_json = resp_json["data"]["sanluong_tungngay"]
-
         from_date = strip_date_range(resp_json[0]["ngayFull"])
         to_date = strip_date_range(
             resp_json[(-2 if len(resp_json) > 2 else 0)]["ngayFull"]
@@ -703,12 +923,52 @@ class EVNAPI:
             "to_date": to_date.date(),
             "from_date": from_date.date(),
             "previous_date": previous_date.date(),
+            # the last row is today, still being metered
+            "daily_series": parse_daily_rows(
+                resp_json[:-1], "ngayFull", "Tong", parse_day_ordinal
+            ),
         }
 
-        resp = await self._session.post(
+        fetched_data.update(
+            optional_result(payment, PAYMENT_UNKNOWN, "EVNHCMC payment data")
+        )
+
+        return fetched_data
+
+    async def _fetch_consumption_evnhcmc(
+        self, customer_id, from_date, to_date, headers
+    ):
+        resp = await self._post(
+            url=self._evn_area.get("evn_data_url"),
+            data={
+                "input_makh": customer_id,
+                "input_tungay": from_date,
+                "input_denngay": to_date,
+            },
+            headers=headers,
+        )
+        status, resp_json = await json_processing(resp)
+
+        if status != CONF_SUCCESS:
+            return status, resp_json
+
+        state = resp_json["state"]
+
+        if state != CONF_SUCCESS:
+            if state == "error_login":
+                return CONF_ERR_INVALID_AUTH, {"status": CONF_ERR_INVALID_AUTH, "data": resp.status}
+
+            _LOGGER.error(
+                f"Cannot request new data from EVN Server for customer ID: {customer_id}\n{resp_json}"
+            )
+            return state, {"status": state, "data": resp_json}
+
+        return CONF_SUCCESS, resp_json["data"]["sanluong_tungngay"]
+
+    async def _fetch_payment_evnhcmc(self, customer_id, headers) -> dict:
+        resp = await self._post(
             url=self._evn_area.get("evn_payment_url"),
             data={"input_makh": customer_id},
-            ssl=ssl_context,
             headers=headers,
         )
         status, resp_json = await json_processing(resp)
@@ -731,11 +991,7 @@ class EVNAPI:
                 elif resp_json["data"].get("isNo") == 0:
                     payment_status = STATUS_N_PAYMENT_NEEDED
 
-        fetched_data.update(
-            {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
-        )
-
-        return fetched_data
+        return {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
 
     async def fetch_daily_range_evnhcmc(
         self,
@@ -755,7 +1011,7 @@ class EVNAPI:
             "input_denngay": end_date,
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             "https://cskh.evnhcmc.vn/Tracuu/ajax_dienNangTieuThuTheoNgay",
             headers=headers,
             data=payload,
@@ -783,7 +1039,7 @@ class EVNAPI:
             "input_makh": customer_id
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             "https://www.evnhcmc.vn/Tracuu/ajax_dienNangTieuThuTheoKyHoaDon",
             headers=headers,
             data=payload,
@@ -820,13 +1076,23 @@ class EVNAPI:
             "DEN_NGAY": to_date_dt.strftime("%d/%m/%Y"),
         }
 
-        resp = await self._session.post(
-            self._evn_area.get("evn_data_url"),
-            json=payload,
-            headers=headers,
+        # payment and load shedding only feed auxiliary sensors, so they
+        # run alongside the consumption request and may fail on their own
+        consumption, payment, loadshedding = await asyncio.gather(
+            self._post(
+                self._evn_area.get("evn_data_url"),
+                json=payload,
+                headers=headers,
+            ),
+            self._fetch_payment_evnnpc(headers),
+            self._fetch_loadshedding_evnnpc(from_date_dt, to_date_dt, headers),
+            return_exceptions=True,
         )
 
-        status, resp_json = await json_processing(resp)
+        status, resp_json = await json_processing(required_result(consumption))
+        if status == CONF_ERR_INVALID_AUTH:
+            return resp_json
+
         if status != CONF_SUCCESS or not resp_json.get("data"):
             return {"status": CONF_ERR_NO_MONITOR}
 
@@ -867,63 +1133,78 @@ class EVNAPI:
             "from_date": from_date_dt,
             "to_date": to_date_dt,
             "previous_date": previous_date_dt,
+            "daily_series": parse_meter_rows(
+                data, "NGAY", "CHISO_MOI", slash_date_ordinal
+            ),
         }
 
-        resp = await self._session.post(
+        fetched_data.update(
+            optional_result(payment, PAYMENT_UNKNOWN, "EVNNPC payment data")
+        )
+        fetched_data.update(
+            optional_result(
+                loadshedding, LOADSHEDDING_UNKNOWN, "EVNNPC load shedding data"
+            )
+        )
+
+        return fetched_data
+
+    async def _fetch_payment_evnnpc(self, headers):
+        """Fetch the latest EVNNPC bill status."""
+
+        resp = await self._post(
             self._evn_area.get("evn_payment_url"),
             headers=headers,
         )
 
         status, bill_json = await json_processing(resp)
 
-        if status == CONF_SUCCESS and bill_json.get("data"):
-            bill = bill_json["data"][0]
-            if bill.get("TTRANG_TTOAN") == "CHUATT":
-                fetched_data.update({
-                    ID_PAYMENT_NEEDED: STATUS_PAYMENT_NEEDED,
-                    ID_M_PAYMENT_NEEDED: int(bill.get("TONG_TIEN", 0)),
-                })
-            else:
-                fetched_data.update({
-                    ID_PAYMENT_NEEDED: STATUS_N_PAYMENT_NEEDED,
-                    ID_M_PAYMENT_NEEDED: 0,
-                })
-        else:
-            fetched_data.update({
-                ID_PAYMENT_NEEDED: CONF_ERR_UNKNOWN,
-                ID_M_PAYMENT_NEEDED: 0,
-            })
+        if status != CONF_SUCCESS or not bill_json.get("data"):
+            return dict(PAYMENT_UNKNOWN)
 
-        try:
-            payload = {
-                "TU_NGAY": from_date_dt.strftime("%d/%m/%Y"),
-                "DEN_NGAY": to_date_dt.strftime("%d/%m/%Y"),
+        bill = bill_json["data"][0]
+        if bill.get("TTRANG_TTOAN") == "CHUATT":
+            return {
+                ID_PAYMENT_NEEDED: STATUS_PAYMENT_NEEDED,
+                ID_M_PAYMENT_NEEDED: int(bill.get("TONG_TIEN", 0)),
             }
 
-            resp = await self._session.post(
-                self._evn_area.get("evn_loadshedding_url"),
-                json=payload,
-                headers=headers,
-            )
+        return {
+            ID_PAYMENT_NEEDED: STATUS_N_PAYMENT_NEEDED,
+            ID_M_PAYMENT_NEEDED: 0,
+        }
 
-            status, shed_json = await json_processing(resp)
+    async def _fetch_loadshedding_evnnpc(self, from_date_dt, to_date_dt, headers):
+        """Fetch the EVNNPC load shedding schedule for the update window."""
 
-            if status == CONF_SUCCESS and shed_json.get("data"):
-                shed = shed_json["data"][0]
-                fetched_data[ID_LOADSHEDDING] = (
+        payload = {
+            "TU_NGAY": from_date_dt.strftime("%d/%m/%Y"),
+            "DEN_NGAY": to_date_dt.strftime("%d/%m/%Y"),
+        }
+
+        resp = await self._post(
+            self._evn_area.get("evn_loadshedding_url"),
+            json=payload,
+            headers=headers,
+        )
+
+        status, shed_json = await json_processing(resp)
+
+        if status == CONF_SUCCESS and shed_json.get("data"):
+            shed = shed_json["data"][0]
+            return {
+                ID_LOADSHEDDING: (
                     shed.get("THOI_GIAN")
                     or shed.get("NOI_DUNG")
                     or STATUS_LOADSHEDDING
                 )
-            else:
-                fetched_data[ID_LOADSHEDDING] = (
-                    STATUS_LOADSHEDDING if status == CONF_EMPTY else CONF_ERR_UNKNOWN
-                )
+            }
 
-        except Exception:
-            fetched_data[ID_LOADSHEDDING] = CONF_ERR_UNKNOWN
-            
-        return fetched_data
+        return {
+            ID_LOADSHEDDING: (
+                STATUS_LOADSHEDDING if status == CONF_EMPTY else CONF_ERR_UNKNOWN
+            )
+        }
  
     async def fetch_daily_range_evnnpc(
         self,
@@ -945,7 +1226,7 @@ class EVNAPI:
             "DEN_NGAY": to_date.strftime("%d/%m/%Y"),
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             "https://apicskhevn.npc.com.vn/api/evn/tracuu/diennangngay",
             json=payload,
             headers=headers,
@@ -979,7 +1260,7 @@ class EVNAPI:
             "DEN_THANG_NAM": f"{to_month:02d}/{to_year}",
         }
 
-        resp = await self._session.post(
+        resp = await self._post(
             "https://apicskhevn.npc.com.vn/api/evn/tracuu/diennangthang",
             json=payload,
             headers=headers,
@@ -1005,12 +1286,21 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        resp = await self._session.get(
-            url=f"{self._evn_area.get('evn_data_url')}{customer_id}",
-            headers=headers,
+        # the totals come from the payment endpoint, so both are required
+        consumption, payment = await asyncio.gather(
+            self._get(
+                url=f"{self._evn_area.get('evn_data_url')}{customer_id}",
+                headers=headers,
+            ),
+            self._get(
+                url=f"{self._evn_area.get('evn_payment_url')}{customer_id}",
+                headers=headers,
+            ),
         )
 
-        _, resp_json = await json_processing(resp)
+        status, resp_json = await json_processing(consumption)
+        if status == CONF_ERR_INVALID_AUTH:
+            return resp_json
 
         electric = (
             resp_json.get("electricConsumption")
@@ -1037,12 +1327,7 @@ class EVNAPI:
             ),
         }
 
-        resp = await self._session.get(
-            url=f"{self._evn_area.get('evn_payment_url')}{customer_id}",
-            headers=headers,
-        )
-
-        _, resp_json = await json_processing(resp)
+        _, resp_json = await json_processing(payment)
 
         response = (
             resp_json.get("response")
@@ -1098,7 +1383,7 @@ class EVNAPI:
             "Authorization": f"Bearer {self._evn_area.get('access_token')}",
         }
 
-        resp = await self._session.get(
+        resp = await self._get(
             "https://cskh-api.cpc.vn/api/remote/meter/rf/sl-tieu-thu-view",
             params={
                 "customerCode": customer_id,
@@ -1130,7 +1415,7 @@ class EVNAPI:
             "Accept-Encoding": "gzip, deflate, br",
         }
 
-        resp = await self._session.get(url, params=params, headers=headers)
+        resp = await self._get(url, params=params, headers=headers)
 
         # ---- HTTP status check ----
         if resp.status != 200:
@@ -1190,18 +1475,28 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        status, resp_json = await fetch_with_retries(
-            url=self._evn_area.get("evn_data_url"),
-            headers=headers,
-            params={
-                "strMaDiemDo": f"{customer_id}{last_index}",
-                "strFromDate": from_date_str,
-                "strToDate": to_date_str,
-            },
-            session=self._session,
-            api_name="Fetch EVN data"
+        consumption, payment, loadshedding = await asyncio.gather(
+            fetch_json(
+                url=self._evn_area.get("evn_data_url"),
+                headers=headers,
+                params={
+                    "strMaDiemDo": f"{customer_id}{last_index}",
+                    "strFromDate": from_date_str,
+                    "strToDate": to_date_str,
+                },
+                request=self._get,
+                api_name="Fetch EVN data"
+            ),
+            self._fetch_payment_evnspc(customer_id, headers),
+            self._fetch_loadshedding_evnspc(customer_id, headers),
+            return_exceptions=True,
         )
 
+        status, resp_json = required_result(consumption)
+
+        if status == CONF_ERR_INVALID_AUTH:
+            return resp_json
+
         if not resp_json:
             raise ValueError("Received empty response from EVN data API.")
 
@@ -1227,46 +1522,64 @@ class EVNAPI:
             "to_date": to_date.date(),
             "from_date": from_date.date(),
             "previous_date": previous_date.date(),
+            "daily_series": parse_daily_rows(
+                resp_json, "strTime", "dSanLuongBT", slash_date_ordinal
+            ),
         }
 
-        status, resp_json = await fetch_with_retries(
+        fetched_data.update(
+            optional_result(payment, PAYMENT_UNKNOWN, "EVNSPC payment data")
+        )
+        fetched_data.update(
+            optional_result(
+                loadshedding, LOADSHEDDING_UNKNOWN, "EVNSPC load shedding data"
+            )
+        )
+
+        return fetched_data
+
+    async def _fetch_payment_evnspc(self, customer_id, headers):
+        """Fetch the outstanding EVNSPC bill amount."""
+
+        status, resp_json = await fetch_json(
             url=self._evn_area.get("evn_payment_url"),
             headers=headers,
             params={
                 "strMaKH": f"{customer_id}",
             },
-            session=self._session,
-            allow_empty=True,
+            request=self._get,
             api_name="Payment data"
         )
 
-        if status == CONF_SUCCESS and resp_json and isinstance(resp_json, list) and resp_json:
-            m_payment_status = int(resp_json[0].get("lTongTien", 0))
-            fetched_data.update({
+        if status == CONF_SUCCESS and resp_json and isinstance(resp_json, list):
+            return {
                 ID_PAYMENT_NEEDED: STATUS_PAYMENT_NEEDED,
-                ID_M_PAYMENT_NEEDED: m_payment_status
-            })
-        else:
-            fetched_data.update({
-                ID_PAYMENT_NEEDED: STATUS_N_PAYMENT_NEEDED if status == CONF_EMPTY else CONF_ERR_UNKNOWN,
-                ID_M_PAYMENT_NEEDED: 0
-            })
+                ID_M_PAYMENT_NEEDED: int(resp_json[0].get("lTongTien", 0)),
+            }
+
+        return {
+            ID_PAYMENT_NEEDED: STATUS_N_PAYMENT_NEEDED if status == CONF_EMPTY else CONF_ERR_UNKNOWN,
+            ID_M_PAYMENT_NEEDED: 0,
+        }
+
+    async def _fetch_loadshedding_evnspc(self, customer_id, headers):
+        """Fetch the next EVNSPC load shedding window."""
 
-        status, resp_json = await fetch_with_retries(
+        status, resp_json = await fetch_json(
             url=self._evn_area.get("evn_loadshedding_url"),
             headers=headers,
             params={
                 "strMaKH": f"{customer_id}",
             },
-            session=self._session,
+            request=self._get,
             api_name="EVN loadshedding data"
         )
 
-        fetched_data[ID_LOADSHEDDING] = (
-            resp_json[0].get("strThoiGianMatDien") if resp_json else STATUS_LOADSHEDDING if status == CONF_EMPTY else CONF_ERR_UNKNOWN
-        )
-
-        return fetched_data
+        return {
+            ID_LOADSHEDDING: (
+                resp_json[0].get("strThoiGianMatDien") if resp_json else STATUS_LOADSHEDDING if status == CONF_EMPTY else CONF_ERR_UNKNOWN
+            )
+        }
 
     async def fetch_daily_range_evnspc(
         self,
@@ -1291,7 +1604,7 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        status, resp_json = await fetch_with_retries(
+        status, resp_json = await fetch_json(
             url=self._evn_area.get("evn_data_url"),
             headers=headers,
             params={
@@ -1299,7 +1612,7 @@ class EVNAPI:
                 "strFromDate": from_date_str,
                 "strToDate": to_date_str,
             },
-            session=self._session,
+            request=self._get,
             api_name="Fetch EVN daily raw data"
         )
 
@@ -1329,7 +1642,7 @@ class EVNAPI:
             "Accept-Encoding": "gzip",
         }
 
-        status, resp_json = await fetch_with_retries(
+        status, resp_json = await fetch_json(
             url="https://api.cskh.evnspc.vn/api/NghiepVu/TraCuuHoaDon",
             headers=headers,
             params={
@@ -1339,7 +1652,7 @@ class EVNAPI:
                 "iDenThang": to_month,
                 "iDenNam": to_year,
             },
-            session=self._session,
+            request=self._get,
             api_name="Fetch EVN monthly bills"
         )
 
@@ -1348,6 +1661,25 @@ class EVNAPI:
 
         return resp_json
 
+PAYMENT_UNKNOWN = {ID_PAYMENT_NEEDED: CONF_ERR_UNKNOWN, ID_M_PAYMENT_NEEDED: 0}
+LOADSHEDDING_UNKNOWN = {ID_LOADSHEDDING: CONF_ERR_UNKNOWN}
+
+
+def required_result(result):
+    """Unwrap a gather() result, re-raising a sub-request failure."""
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def optional_result(result, fallback: dict, api_name: str) -> dict:
+    """Unwrap an optional gather() result, falling back to unknown values."""
+    if isinstance(result, Exception):
+        _LOGGER.warning("[EVN] %s unavailable: %s", api_name, result)
+        return fallback
+    return required_result(result)
+
+
 async def json_processing(resp):
     if resp.status != 200:
         if resp.status in (400, 401):
@@ -1429,7 +1761,9 @@ def formatted_result(raw_data: dict) -> dict:
             "value": raw_data[ID_ECON_MONTHLY_NEW],
         }
         res[ID_ECOST_MONTHLY_NEW] = {
-            "value": calc_ecost(raw_data[ID_ECON_MONTHLY_NEW]),
+            "value": calc_ecost(
+                raw_data[ID_ECON_MONTHLY_NEW], raw_data["to_date"]
+            ),
         }
 
     if raw_data[ID_ECON_DAILY_NEW] is not None:
@@ -1442,7 +1776,7 @@ def formatted_result(raw_data: dict) -> dict:
 
         res[ID_ECON_DAILY_NEW] = {"value": raw_data[ID_ECON_DAILY_NEW], "info": info}
         res[ID_ECOST_DAILY_NEW] = {
-            "value": calc_ecost(raw_data[ID_ECON_DAILY_NEW]),
+            "value": calc_ecost(raw_data[ID_ECON_DAILY_NEW], raw_data["to_date"]),
             "info": info,
         }
 
@@ -1456,7 +1790,9 @@ def formatted_result(raw_data: dict) -> dict:
 
         res[ID_ECON_DAILY_OLD] = {"value": raw_data[ID_ECON_DAILY_OLD], "info": info}
         res[ID_ECOST_DAILY_OLD] = {
-            "value": calc_ecost(raw_data[ID_ECON_DAILY_OLD]),
+            "value": calc_ecost(
+                raw_data[ID_ECON_DAILY_OLD], raw_data["previous_date"]
+            ),
             "info": info,
         }
 
@@ -1514,6 +1850,9 @@ def formatted_result(raw_data: dict) -> dict:
 
     res[ID_LATEST_UPDATE] = {"value": time_obj.astimezone()}
 
+    # full per-day series of the period, stored by EVNDataStorage
+    res["daily_series"] = raw_data.get("daily_series", [])
+
     return res
 
 def get_evn_info(evn_customer_id: str):
@@ -1631,27 +1970,20 @@ def strip_date_range(date_str):
         stripped_date = date_str.strip()
     return parser.parse(stripped_date, dayfirst=True)
 
-async def fetch_with_retries(
-    url, headers, params, max_retries=3, session=None, allow_empty=False, api_name="API"
-):
-    """Fetch data with retry mechanism."""
-    for attempt in range(max_retries):
-        try:
-            resp = await session.get(url=url, headers=headers, params=params, ssl=False)
-            status, resp_json = await json_processing(resp)
-            
-            if status == CONF_EMPTY:
-                return CONF_EMPTY, []
+async def fetch_json(url, headers, params, request, api_name="API"):
+    """Fetch JSON data through ``request``, which retries transient failures."""
+    resp = await request(url, headers=headers, params=params)
+    status, resp_json = await json_processing(resp)
 
-            if status == CONF_SUCCESS or (allow_empty and status == CONF_EMPTY):
-                return status, resp_json
-            
-            _LOGGER.error(f"Attempt {attempt + 1}/{max_retries} failed for {api_name}: {resp_json}")
-        
-        except Exception as e:
-            _LOGGER.error(f"Attempt {attempt + 1}/{max_retries} encountered an error: {str(e)}")
+    if status == CONF_EMPTY:
+        return CONF_EMPTY, []
+
+    # a rejected token is renewed by the caller
+    if status in (CONF_SUCCESS, CONF_ERR_INVALID_AUTH):
+        return status, resp_json
+
+    raise EVNRequestError(f"Failed to fetch data of {api_name}: {status}")
 
-    raise Exception(f"Failed to fetch data of {api_name} after {max_retries} attempts.")
 
 def get_evn_info_sync(customer_id: str, branches_data=None):
     """Synchronous helper to get EVN info"""
@@ -0,0 +1,208 @@
+"""Retry policy and circuit breakers for the EVN endpoints.
+
+Transient failures (connection errors, timeouts, 429 and 5xx answers) are
+retried with exponential backoff and full jitter, honouring a Retry-After
+header. Every host has a circuit breaker shared by all config entries:
+after a run of consecutive failures it opens, and calls to the host fail
+fast without touching the network until the cool-down has passed and a
+single probe call gets through.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    DOMAIN,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_BREAKERS = "breakers"
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class EVNRequestError(Exception):
+    """An EVN request failed for good."""
+
+
+class EVNCircuitOpenError(EVNRequestError):
+    """The host is paused by its circuit breaker."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to wait between attempts of a request."""
+
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay after the failed ``attempt`` (counted from 0)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def retry_after(resp) -> Optional[float]:
+    """Seconds asked for by the Retry-After header, None without one."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one host."""
+
+    def __init__(
+        self,
+        host: str,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+    ):
+        self.host = host
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._open_until: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Whether a call may go out now.
+
+        Once the cool-down of an open breaker is over one probe call is
+        let through; the others keep failing fast until it succeeds, or
+        for another cool-down if it never reports back.
+        """
+        if self._open_until is None:
+            return True
+
+        now = time.monotonic()
+        if now < self._open_until:
+            return False
+
+        self._open_until = now + self._cooldown
+        return True
+
+    def record_success(self):
+        if self._open_until is not None:
+            _LOGGER.info("[EVN] %s is reachable again", self.host)
+        self._failures = 0
+        self._open_until = None
+
+    def record_failure(self, cooldown: Optional[float] = None):
+        """Count a failure; ``cooldown`` opens the breaker at once for that long."""
+        self._failures += 1
+        if cooldown is None and self._failures < self._threshold:
+            return
+
+        cooldown = max(cooldown or 0, self._cooldown)
+        if self._open_until is None:
+            _LOGGER.warning(
+                "[EVN] %s is failing, pausing requests to it for %.0f seconds",
+                self.host,
+                cooldown,
+            )
+        self._open_until = time.monotonic() + cooldown
+
+
+def get_circuit_breaker(hass: HomeAssistant, url) -> CircuitBreaker:
+    """Circuit breaker of the host of ``url``, shared by all config entries."""
+    breakers = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_BREAKERS, {})
+    host = urlsplit(str(url)).hostname or str(url)
+
+    breaker = breakers.get(host)
+    if breaker is None:
+        breaker = breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+async def async_request(
+    session: aiohttp.ClientSession,
+    breaker: CircuitBreaker,
+    method: str,
+    url,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    **kwargs,
+):
+    """Send a request under a retry policy and the host's circuit breaker.
+
+    Returns the response of the last attempt, which still carries a
+    retryable status once the attempts are used up. Raises
+    EVNCircuitOpenError while the host is paused and EVNRequestError when
+    the last attempt cannot connect.
+    """
+    for attempt in range(1, policy.attempts + 1):
+        if not breaker.allow():
+            raise EVNCircuitOpenError(
+                f"{breaker.host} is paused after repeated failures"
+            )
+
+        try:
+            resp = await session.request(method, url, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            breaker.record_failure()
+            if attempt == policy.attempts:
+                raise EVNRequestError(
+                    f"{method} {breaker.host} failed after {attempt} attempts: {err!r}"
+                ) from err
+            reason = repr(err)
+            delay = policy.backoff(attempt - 1)
+        else:
+            if resp.status not in RETRY_STATUSES:
+                breaker.record_success()
+                return resp
+
+            wait = retry_after(resp)
+            if wait is not None and wait > policy.max_delay:
+                # not worth holding the update for; pause the host instead
+                breaker.record_failure(wait)
+                return resp
+
+            breaker.record_failure()
+            if attempt == policy.attempts:
+                return resp
+            resp.release()
+            reason = f"HTTP {resp.status}"
+            delay = policy.backoff(attempt - 1) if wait is None else wait
+
+        _LOGGER.debug(
+            "[EVN] %s %s: %s, attempt %d/%d, retrying in %.1f seconds",
+            method,
+            breaker.host,
+            reason,
+            attempt,
+            policy.attempts,
+            delay,
+        )
+        await asyncio.sleep(delay)
@@ -3,9 +3,8 @@
 import logging
 from typing import Any
 import os
-from datetime import datetime
 
-from .data_storage import EVNDataStorage
+from .data_storage import get_storage
 
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from homeassistant.components.sensor import (
@@ -36,7 +35,8 @@ from .const import (
     CONF_PASSWORD,
     CONF_SUCCESS,
     CONF_USERNAME,
-    CONF_HISTORY_START_DATE,
+    DATA_API,
+    DATA_INITIAL_UPDATE,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     ID_ECON_DAILY_NEW,
@@ -45,6 +45,7 @@ from .const import (
     ID_ECOST_DAILY_OLD,
 )
 
+from .retry import EVNRequestError
 from .types import EVN_SENSORS, EVNSensorEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
@@ -53,10 +54,11 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
-    entry_config = hass.data[DOMAIN][entry.entry_id]
-    evn_api = nestup_evn.EVNAPI(hass, True)
-    evn_device = EVNDevice(entry_config, evn_api)
-    await evn_device.async_create_coordinator(hass)
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    evn_device = EVNDevice(entry.data, entry_data[DATA_API])
+    await evn_device.async_create_coordinator(
+        hass, entry_data.pop(DATA_INITIAL_UPDATE, None)
+    )
 
     entities = [
         EVNSensor(evn_device, description, hass)
@@ -79,18 +81,8 @@ class EVNDevice:
         self._branches_data = None
         self._coordinator = None
 
-        history_start_iso = dataset.get(CONF_HISTORY_START_DATE)
-        history_start_date = None
-        if history_start_iso:
-            history_start_date = datetime.strptime(
-                history_start_iso, "%Y-%m-%d"
-            ).date()
-
-        self._storage = EVNDataStorage(
-            self.hass,
-            self._customer_id,
-            history_start_date=history_start_date,
-        )
+        # created and loaded by async_setup_entry, shared with the views
+        self._storage = get_storage(self.hass, self._customer_id)
 
     async def async_load_branches(self):
         try:
@@ -105,32 +97,58 @@ class EVNDevice:
             _LOGGER.error("Load branch data failed: %s", ex)
 
     async def update(self) -> dict[str, Any]:
-        data = await self._api.request_update(
-            self._area_name,
-            self._username,
-            self._password,
-            self._customer_id,
-            self._monthly_start,
-        )
+        try:
+            data = await self._api.request_update(
+                self._area_name,
+                self._username,
+                self._password,
+                self._customer_id,
+                self._monthly_start,
+            )
+        except EVNRequestError as err:
+            raise UpdateFailed(f"EVN update failed: {err}") from err
 
         if data.get("status") != CONF_SUCCESS:
             raise UpdateFailed(f"EVN update failed: {self._customer_id}")
 
+        return await self._async_process(data)
+
+    async def _async_process(self, data: dict[str, Any]) -> dict[str, Any]:
         self._data = data
         await self._storage.async_update_from_sensor_data(data)
-        await self._storage.async_sync_monthly_history(self._api)
-        self._storage.start_background_backfill(self._api)
+
+        # bills and backfill only feed the history, they never fail setup
+        # or the update itself
+        try:
+            await self._storage.async_sync_monthly_history(self._api)
+        except Exception as ex:
+            _LOGGER.warning(
+                "[EVN] Monthly bill sync failed for %s: %s",
+                self._customer_id,
+                ex,
+            )
+
+        try:
+            self._storage.start_background_backfill(self._api)
+        except Exception as ex:
+            _LOGGER.warning(
+                "[EVN] Cannot start backfill for %s: %s",
+                self._customer_id,
+                ex,
+            )
+
         return self._data
 
     async def _async_update(self):
         return await self.update()
 
-    async def async_create_coordinator(self, hass: HomeAssistant) -> None:
+    async def async_create_coordinator(
+        self, hass: HomeAssistant, initial_data: dict[str, Any] | None = None
+    ) -> None:
         if self._coordinator:
             return
 
         await self.async_load_branches()
-        await self._storage.async_load()
 
         coordinator = DataUpdateCoordinator(
             hass,
@@ -140,9 +158,14 @@ class EVNDevice:
             update_interval=DEFAULT_SCAN_INTERVAL,
         )
         self._coordinator = coordinator
-        await coordinator.async_config_entry_first_refresh()
-        if not self._storage.data.get("meta", {}).get("backfill_done"):
-            self._storage.start_background_backfill(self._api)
+
+        if initial_data is not None:
+            # entry setup has just fetched everything, no second round-trip
+            coordinator.async_set_updated_data(
+                await self._async_process(initial_data)
+            )
+        else:
+            await coordinator.async_config_entry_first_refresh()
 
     @property
     def coordinator(self):
@@ -0,0 +1,654 @@
+"""Persistence backends for EVNDataStorage.
+
+Backends only do blocking file I/O and are always called from the executor.
+EVNDataStorage owns the in-memory model. It hands every backend a snapshot,
+made of the monthly/meta dict plus the DailySeries columns, and the records
+added since the previous write. Each backend can then pick the cheapest way
+to persist them.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from .const import (
+    STORAGE_MODE_BINARY,
+    STORAGE_MODE_JOURNAL,
+    STORAGE_MODE_JSON,
+    STORAGE_MODE_SQLITE,
+)
+from .history import NO_COST, DailySeries, parse_daily_record
+
+_LOGGER = logging.getLogger(__name__)
+
+# ("daily" | "monthly" | "meta", record) pairs changed since the last write;
+# a "meta" record is the whole meta dict
+Changes = List[Tuple[str, Dict]]
+
+JOURNAL_COMPACT_ENTRIES = 500
+
+
+def atomic_write(path: str, payload: bytes):
+    """Write payload to a temp file and atomically move it over path."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def dump_json(data: Dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def split_daily(data: Dict) -> Tuple[Dict, DailySeries]:
+    """Turn a legacy dict with a "daily" list into (data, DailySeries)."""
+    daily = DailySeries.from_records(data.pop("daily", None) or [])
+    return data, daily
+
+
+def legacy_json(data: Dict, daily: DailySeries) -> bytes:
+    """The historical <customer_id>.json representation."""
+    return dump_json(dict(data, daily=daily.records()))
+
+
+class FileBackend:
+    """File handling shared by the backends keeping one customer per file."""
+
+    def __init__(self, storage_dir: str, customer_id: str, file_path: str):
+        self.storage_dir = storage_dir
+        self.customer_id = customer_id
+        self.file_path = file_path
+
+    def data_files(self) -> List[str]:
+        return [self.file_path]
+
+    def files(self) -> List[str]:
+        return [
+            path for each in self.data_files() for path in (each, f"{each}.bak")
+        ]
+
+    def exists(self) -> bool:
+        return any(os.path.exists(path) for path in self.data_files())
+
+    def retire(self):
+        """Keep the files as .bak once another backend took the history over."""
+        for path in self.data_files():
+            if os.path.exists(path):
+                os.replace(path, f"{path}.bak")
+
+    def remove(self) -> bool:
+        removed = False
+        for path in self.files():
+            if os.path.exists(path):
+                os.remove(path)
+                removed = True
+        return removed
+
+
+class JSONBackend(FileBackend):
+    """One compact JSON snapshot per customer, rewritten on every flush."""
+
+    def __init__(self, storage_dir: str, customer_id: str):
+        super().__init__(
+            storage_dir,
+            customer_id,
+            os.path.join(storage_dir, f"{customer_id}.json"),
+        )
+        # log of the journal mode, which shares this snapshot
+        self.log_path = os.path.join(storage_dir, f"{customer_id}.journal.jsonl")
+
+    def exists(self) -> bool:
+        return super().exists() or os.path.exists(self.log_path)
+
+    def _read(self) -> Dict:
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as ex:
+            _LOGGER.warning(
+                "[EVN] Cannot read history file %s: %s", self.file_path, ex
+            )
+            return {}
+
+    def load(self) -> Tuple[Dict, DailySeries]:
+        if os.path.exists(self.log_path):
+            # left behind by the journal mode: fold it into the snapshot, so
+            # it is neither lost nor replayed over newer data later
+            journal = JournalBackend(self.storage_dir, self.customer_id)
+            data, daily = journal.load()
+            journal.compact(data, daily)
+            return data, daily
+
+        return split_daily(self._read())
+
+    def write(self, data: Dict, daily: DailySeries, changes: Optional[Changes]):
+        atomic_write(self.file_path, legacy_json(data, daily))
+
+
+class JournalBackend(JSONBackend):
+    """JSON snapshot plus an append-only JSONL log of changed records.
+
+    Each flush appends only the changed records, so its cost does not
+    depend on how much history is kept. A logged daily record replaces the
+    stored day, which is how repriced days are written. Once the log grows
+    past JOURNAL_COMPACT_ENTRIES lines it is folded into the snapshot.
+    """
+
+    def __init__(self, storage_dir: str, customer_id: str):
+        super().__init__(storage_dir, customer_id)
+        self._log_entries = 0
+
+    def load(self) -> Tuple[Dict, DailySeries]:
+        data, daily = split_daily(self._read())
+        self._log_entries = 0
+
+        if not os.path.exists(self.log_path):
+            return data, daily
+
+        data.setdefault("monthly", [])
+
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._log_entries += 1
+                try:
+                    entry = json.loads(line)
+                    kind, record = entry["t"], entry["r"]
+                except Exception:
+                    # torn write at the tail, compact on the next flush so we
+                    # never append behind a broken line
+                    self._log_entries = JOURNAL_COMPACT_ENTRIES
+                    continue
+
+                if kind == "daily":
+                    parsed = parse_daily_record(record)
+                    if parsed is not None:
+                        daily.upsert(*parsed)
+                elif kind == "monthly":
+                    data["monthly"].append(record)
+                elif kind == "meta":
+                    data["meta"] = record
+
+        return data, daily
+
+    def write(self, data: Dict, daily: DailySeries, changes: Optional[Changes]):
+        if (
+            changes is None
+            or self._log_entries + len(changes) >= JOURNAL_COMPACT_ENTRIES
+        ):
+            self.compact(data, daily)
+            return
+
+        if not changes:
+            return
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        payload = b"".join(
+            dump_json({"t": kind, "r": record}) + b"\n"
+            for kind, record in changes
+        )
+        with open(self.log_path, "ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log_entries += len(changes)
+
+    def compact(self, data: Dict, daily: DailySeries):
+        """Fold the log into a fresh snapshot and truncate it."""
+        super().write(data, daily, None)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._log_entries = 0
+
+    def data_files(self) -> List[str]:
+        return [self.file_path, self.log_path]
+
+
+class BinaryBackend(FileBackend):
+    """Compact versioned binary snapshot, one file per customer.
+
+    Layout: a fixed header, then a body. The body is optionally
+    zlib-compressed:
+
+        header  <4sBBII  magic, version, flags, day count, extra length
+        body    day ordinals  int32[count]
+                kWh           float64[count]
+                cost          int64[count]   (NO_COST when unknown)
+                extra         UTF-8 JSON with the monthly records and meta
+
+    Each column is written straight from the DailySeries arrays, so a day
+    costs 20 bytes before compression and no per-row Python work. A legacy
+    <customer_id>.json is imported on first load, see load_history().
+    """
+
+    MAGIC = b"EVNH"
+    VERSION = 1
+    FLAG_ZLIB = 0x01
+    HEADER = struct.Struct("<4sBBII")
+
+    def __init__(
+        self, storage_dir: str, customer_id: str, compress: bool = True
+    ):
+        super().__init__(
+            storage_dir,
+            customer_id,
+            os.path.join(storage_dir, f"{customer_id}.evnh"),
+        )
+        self.compress = compress
+
+    @staticmethod
+    def _le(column: array) -> array:
+        """Columns are stored little-endian whatever the host order is."""
+        if sys.byteorder != "little":
+            column = array(column.typecode, column)
+            column.byteswap()
+        return column
+
+    def encode(self, data: Dict, daily: DailySeries) -> bytes:
+        extra = dump_json(data)
+        body = b"".join(
+            (
+                self._le(daily.days).tobytes(),
+                self._le(daily.kwh).tobytes(),
+                self._le(daily.cost).tobytes(),
+                extra,
+            )
+        )
+        flags = 0
+        if self.compress:
+            body = zlib.compress(body, 6)
+            flags |= self.FLAG_ZLIB
+
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, flags, len(daily), len(extra)
+        )
+        return header + body
+
+    def decode(self, payload: bytes) -> Tuple[Dict, DailySeries]:
+        magic, version, flags, count, extra_len = self.HEADER.unpack_from(
+            payload
+        )
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"unsupported history format {magic!r} v{version}")
+
+        body = payload[self.HEADER.size:]
+        if flags & self.FLAG_ZLIB:
+            body = zlib.decompress(body)
+
+        columns = []
+        offset = 0
+        for typecode in ("i", "d", "q"):
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(body[offset:offset + size])
+            columns.append(self._le(column))
+            offset += size
+
+        if len(body) != offset + extra_len:
+            raise ValueError("truncated history file")
+
+        data = json.loads(body[offset:].decode("utf-8")) if extra_len else {}
+        return data, DailySeries.from_columns(*columns)
+
+    def load(self) -> Tuple[Dict, DailySeries]:
+        if not os.path.exists(self.file_path):
+            return {}, DailySeries()
+
+        try:
+            with open(self.file_path, "rb") as f:
+                return self.decode(f.read())
+        except Exception as ex:
+            _LOGGER.warning(
+                "[EVN] Cannot read history file %s: %s", self.file_path, ex
+            )
+            return {}, DailySeries()
+
+    def write(self, data: Dict, daily: DailySeries, changes: Optional[Changes]):
+        atomic_write(self.file_path, self.encode(data, daily))
+
+
+def _iso_from_day(value: str) -> Optional[str]:
+    """DD-MM-YYYY -> YYYY-MM-DD, the sortable form used as SQLite key."""
+    try:
+        day, month, year = value.split("-")
+        return date(int(year), int(month), int(day)).isoformat()
+    except Exception:
+        return None
+
+
+class SQLiteBackend:
+    """All customers in one SQLite database, keyed by customer and date.
+
+    Daily rows are keyed by (customer_id, day) and monthly rows by
+    (customer_id, year, month). Both keys are WITHOUT ROWID primary keys, so
+    range scans and upserts use the index directly. Every flush runs in a
+    single transaction.
+    """
+
+    DB_NAME = "history.db"
+
+    _connections: Dict[str, Tuple[sqlite3.Connection, threading.Lock]] = {}
+    _connections_lock = threading.Lock()
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS daily (
+            customer_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            kwh REAL,
+            cost INTEGER,
+            PRIMARY KEY (customer_id, day)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS monthly (
+            customer_id TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            kwh REAL,
+            cost INTEGER,
+            PRIMARY KEY (customer_id, year, month)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS meta (
+            customer_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        )
+        """,
+    )
+
+    def __init__(self, storage_dir: str, customer_id: str):
+        self.storage_dir = storage_dir
+        self.customer_id = customer_id
+        self.file_path = os.path.join(storage_dir, self.DB_NAME)
+
+    def _connect(self) -> Tuple[sqlite3.Connection, threading.Lock]:
+        """Return the process-wide connection for this database file."""
+        with self._connections_lock:
+            if self.file_path not in self._connections:
+                os.makedirs(self.storage_dir, exist_ok=True)
+                conn = sqlite3.connect(
+                    self.file_path, check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                with conn:
+                    for statement in self.SCHEMA:
+                        conn.execute(statement)
+                self._connections[self.file_path] = (conn, threading.Lock())
+            return self._connections[self.file_path]
+
+    @staticmethod
+    def _daily_row(customer_id: str, record: Dict) -> Optional[Tuple]:
+        day = _iso_from_day(str(record.get("Ngày")))
+        if day is None:
+            return None
+        return (
+            customer_id,
+            day,
+            record.get("Điện tiêu thụ (kWh)"),
+            record.get("Tiền điện (VND)"),
+        )
+
+    @staticmethod
+    def _daily_rows(customer_id: str, daily: DailySeries) -> List[Tuple]:
+        return [
+            (
+                customer_id,
+                date.fromordinal(ordinal).isoformat(),
+                kwh,
+                None if cost == NO_COST else cost,
+            )
+            for ordinal, kwh, cost in zip(daily.days, daily.kwh, daily.cost)
+        ]
+
+    @staticmethod
+    def _monthly_row(customer_id: str, record: Dict) -> Optional[Tuple]:
+        try:
+            year, month = int(record.get("Năm")), int(record.get("Tháng"))
+        except (TypeError, ValueError):
+            return None
+        return (
+            customer_id,
+            year,
+            month,
+            record.get("Điện tiêu thụ (KWh)"),
+            record.get("Tiền Điện"),
+        )
+
+    def load(self) -> Tuple[Dict, DailySeries]:
+        if not os.path.exists(self.file_path):
+            return {}, DailySeries()
+
+        conn, lock = self._connect()
+        with lock:
+            daily = conn.execute(
+                "SELECT day, kwh, cost FROM daily WHERE customer_id = ? "
+                "ORDER BY day",
+                (self.customer_id,),
+            ).fetchall()
+            monthly = conn.execute(
+                "SELECT year, month, kwh, cost FROM monthly "
+                "WHERE customer_id = ? ORDER BY year, month",
+                (self.customer_id,),
+            ).fetchall()
+            meta = conn.execute(
+                "SELECT data FROM meta WHERE customer_id = ?",
+                (self.customer_id,),
+            ).fetchone()
+
+        series = DailySeries.from_columns(
+            array("i", (date.fromisoformat(day).toordinal() for day, _, _ in daily)),
+            array("d", (kwh or 0.0 for _, kwh, _ in daily)),
+            array("q", (NO_COST if cost is None else cost for _, _, cost in daily)),
+        )
+        data = {
+            "monthly": [
+                {
+                    "Tháng": month,
+                    "Năm": year,
+                    "Điện tiêu thụ (KWh)": kwh,
+                    "Tiền Điện": cost,
+                }
+                for year, month, kwh, cost in monthly
+            ],
+        }
+        if meta:
+            data["meta"] = json.loads(meta[0])
+        return data, series
+
+    def write(self, data: Dict, daily: DailySeries, changes: Optional[Changes]):
+        if changes is None:
+            daily_rows = self._daily_rows(self.customer_id, daily)
+            monthly = data.get("monthly", [])
+        else:
+            daily_rows = [
+                row
+                for row in (
+                    self._daily_row(self.customer_id, r)
+                    for kind, r in changes
+                    if kind == "daily"
+                )
+                if row
+            ]
+            monthly = [r for kind, r in changes if kind == "monthly"]
+
+        monthly_rows = [
+            row
+            for row in (self._monthly_row(self.customer_id, r) for r in monthly)
+            if row
+        ]
+
+        conn, lock = self._connect()
+        with lock, conn:
+            if changes is None:
+                conn.execute(
+                    "DELETE FROM daily WHERE customer_id = ?",
+                    (self.customer_id,),
+                )
+                conn.execute(
+                    "DELETE FROM monthly WHERE customer_id = ?",
+                    (self.customer_id,),
+                )
+            conn.executemany(
+                "INSERT INTO daily (customer_id, day, kwh, cost) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (customer_id, day) DO UPDATE SET "
+                "kwh = excluded.kwh, cost = excluded.cost",
+                daily_rows,
+            )
+            conn.executemany(
+                "INSERT INTO monthly (customer_id, year, month, kwh, cost) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (customer_id, year, month) DO UPDATE SET "
+                "kwh = excluded.kwh, cost = excluded.cost",
+                monthly_rows,
+            )
+            # meta is small, it is upserted with every write
+            conn.execute(
+                "INSERT INTO meta (customer_id, data) VALUES (?, ?) "
+                "ON CONFLICT (customer_id) DO UPDATE SET data = excluded.data",
+                (self.customer_id, json.dumps(data.get("meta", {}))),
+            )
+
+    def files(self) -> List[str]:
+        return []
+
+    def exists(self) -> bool:
+        if not os.path.exists(self.file_path):
+            return False
+
+        conn, lock = self._connect()
+        with lock:
+            return any(
+                conn.execute(
+                    f"SELECT 1 FROM {table} WHERE customer_id = ? LIMIT 1",
+                    (self.customer_id,),
+                ).fetchone()
+                for table in ("meta", "daily", "monthly")
+            )
+
+    def retire(self):
+        self.remove()
+
+    def remove(self) -> bool:
+        if not os.path.exists(self.file_path):
+            return False
+
+        conn, lock = self._connect()
+        with lock, conn:
+            removed = 0
+            for table in ("daily", "monthly", "meta"):
+                removed += conn.execute(
+                    f"DELETE FROM {table} WHERE customer_id = ?",
+                    (self.customer_id,),
+                ).rowcount
+        return removed > 0
+
+
+STORAGE_BACKENDS = {
+    STORAGE_MODE_BINARY: BinaryBackend,
+    STORAGE_MODE_JSON: JSONBackend,
+    STORAGE_MODE_JOURNAL: JournalBackend,
+    STORAGE_MODE_SQLITE: SQLiteBackend,
+}
+
+
+def create_backend(mode: str, storage_dir: str, customer_id: str):
+    backend_cls = STORAGE_BACKENDS.get(mode)
+    if backend_cls is None:
+        _LOGGER.warning("[EVN] Unknown storage mode %s, using binary", mode)
+        backend_cls = BinaryBackend
+    return backend_cls(storage_dir, customer_id)
+
+
+def merge_history(
+    sources: List[Tuple[Dict, DailySeries]]
+) -> Tuple[Dict, DailySeries]:
+    """Union of several copies of a history.
+
+    Every day and bill any copy holds is kept, the first copy winning a
+    day or meta key they share. Duplicate bills are dropped on load.
+    """
+    data: Dict = {"monthly": [], "meta": {}}
+    daily = DailySeries()
+    for src_data, src_daily in sources:
+        for key, value in src_data.items():
+            if key == "monthly":
+                data["monthly"].extend(value)
+            elif key == "meta":
+                for meta_key, meta_value in value.items():
+                    data["meta"].setdefault(meta_key, meta_value)
+            else:
+                data.setdefault(key, value)
+
+        for row in zip(src_daily.days, src_daily.kwh, src_daily.cost):
+            daily.insert(*row)
+    return data, daily
+
+
+def load_history(backend) -> Tuple[Dict, DailySeries]:
+    """Load a customer's history, importing it on first use of a backend.
+
+    When the configured backend has nothing stored yet, e.g. right after
+    the storage mode changed, whatever the other backends hold is merged
+    and written into it. Every other copy is then retired, so none of them
+    can be loaded stale after a later mode change.
+    """
+    if backend.exists():
+        return backend.load()
+
+    found = []
+    for backend_cls in STORAGE_BACKENDS.values():
+        # the journal reads the JSON snapshot too, plus its log
+        if backend_cls is JSONBackend:
+            continue
+        source = backend_cls(backend.storage_dir, backend.customer_id)
+        if source.file_path == backend.file_path or not source.exists():
+            continue
+        found.append((source, *source.load()))
+
+    if not found:
+        return {}, DailySeries()
+
+    data, daily = merge_history([(data, daily) for _, data, daily in found])
+    backend.write(data, daily, None)
+    for source, _, _ in found:
+        source.retire()
+
+    _LOGGER.info(
+        "[EVN] Migrated history of %s to %s (%d days)",
+        backend.customer_id,
+        backend.file_path,
+        len(daily),
+    )
+    return data, daily
+
+
+def remove_customer_data(storage_dir: str, customer_id: str) -> bool:
+    """Delete the history any backend may have stored for a customer."""
+    removed = False
+    for backend_cls in STORAGE_BACKENDS.values():
+        removed = backend_cls(storage_dir, customer_id).remove() or removed
+    return removed
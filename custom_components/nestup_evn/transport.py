@@ -0,0 +1,127 @@
+"""Pooled HTTP transport for the EVN endpoints.
+
+Every EVN area gets one tuned TCPConnector, shared by all accounts of the
+area, so consecutive calls to the same host reuse warm keep-alive TLS
+connections and cached DNS answers. SSL settings live on the connector,
+not on the calls, so all requests of an area fall in the same pool. Each
+account still has its own ClientSession on top of it, which keeps cookie
+jars (the EVNHCMC session cookie) apart.
+"""
+
+import asyncio
+import logging
+import ssl
+from typing import Optional
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+
+from .const import (
+    DOMAIN,
+    TRANSPORT_DNS_TTL,
+    TRANSPORT_KEEPALIVE,
+    TRANSPORT_LIMIT,
+    TRANSPORT_LIMIT_PER_HOST,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_CONNECTORS = "connectors"
+
+
+def create_ssl_context():
+    """Create SSL context with cipher settings"""
+    context = ssl.create_default_context()
+    context.set_ciphers("ALL:@SECLEVEL=1")
+    return context
+
+
+# SSL contexts load the CA bundle from disk, so each kind is built once per
+# process in the executor and shared by every connector
+SSL_DEFAULT = "default"
+SSL_LEGACY = "legacy"  # SECLEVEL=1 ciphers for EVNHCMC
+
+_SSL_BUILDERS = {
+    SSL_DEFAULT: ssl.create_default_context,
+    SSL_LEGACY: create_ssl_context,
+}
+_ssl_contexts: dict[str, ssl.SSLContext] = {}
+_ssl_lock = asyncio.Lock()
+
+# SSL setting of each area's connector, SSL_DEFAULT when not listed;
+# False skips verification, as the EVNSPC API has always been called
+_AREA_SSL = {
+    "EVNSPC": False,
+    "EVNHCMC": SSL_LEGACY,
+}
+
+
+async def async_get_ssl_context(
+    hass: HomeAssistant, kind: str = SSL_DEFAULT
+) -> ssl.SSLContext:
+    """Return the shared SSL context of a kind, building it on first use"""
+    context = _ssl_contexts.get(kind)
+    if context is not None:
+        return context
+
+    async with _ssl_lock:
+        if kind not in _ssl_contexts:
+            _ssl_contexts[kind] = await hass.async_add_executor_job(
+                _SSL_BUILDERS[kind]
+            )
+    return _ssl_contexts[kind]
+
+
+async def async_get_connector(
+    hass: HomeAssistant, area_name: Optional[str]
+) -> aiohttp.TCPConnector:
+    """Return the connector of an area, creating it on first use."""
+    connectors = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_CONNECTORS, {})
+
+    connector = connectors.get(area_name)
+    if connector is not None and not connector.closed:
+        return connector
+
+    ssl_setting = _AREA_SSL.get(area_name, SSL_DEFAULT)
+    if ssl_setting is not False:
+        ssl_setting = await async_get_ssl_context(hass, ssl_setting)
+
+    # another caller may have created it while the context was built
+    connector = connectors.get(area_name)
+    if connector is not None and not connector.closed:
+        return connector
+
+    if not connectors:
+
+        async def _async_close_connectors(_event: Event):
+            for each in connectors.values():
+                await each.close()
+            connectors.clear()
+
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_connectors
+        )
+
+    connector = aiohttp.TCPConnector(
+        limit=TRANSPORT_LIMIT,
+        limit_per_host=TRANSPORT_LIMIT_PER_HOST,
+        keepalive_timeout=TRANSPORT_KEEPALIVE,
+        ttl_dns_cache=TRANSPORT_DNS_TTL,
+        ssl=ssl_setting,
+    )
+    connectors[area_name] = connector
+    _LOGGER.debug("[EVN] Created connection pool for %s", area_name)
+    return connector
+
+
+async def async_create_session(
+    hass: HomeAssistant, area_name: Optional[str]
+) -> aiohttp.ClientSession:
+    """Return a new session of one account on its area's shared connector.
+
+    The caller closes it; the connector outlives it.
+    """
+    connector = await async_get_connector(hass, area_name)
+    return aiohttp.ClientSession(connector=connector, connector_owner=False)
@@ -1,35 +1,161 @@
-from .const import VIETNAM_ECOST_STAGES, VIETNAM_ECOST_VAT
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-def calc_ecost(kwh: float) -> int:
-    """Calculate electric cost based on e-consumption"""
+from .const import VIETNAM_ECOST_TARIFFS
 
-    if kwh <= 0:
-        return 0
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with Home Assistant
+    np = None
 
-    total_price = 0.0
 
-    e_stage_list = sorted(VIETNAM_ECOST_STAGES.keys())
+class Tariff:
+    """Tiered tariff compiled once into floors, prices and prefix costs.
 
-    for index, e_stage in enumerate(e_stage_list):
-        if kwh < e_stage:
-            break
+    Pricing a value is a bisect over the tier floors plus one multiply,
+    instead of walking every tier.
+    """
 
-        if e_stage == e_stage_list[-1]:
-            total_price += (kwh - e_stage) * VIETNAM_ECOST_STAGES[e_stage]
-        else:
-            next_stage = e_stage_list[index + 1]
-            total_price += (
-                (next_stage - e_stage)
-                if kwh > next_stage
-                else (kwh - e_stage)
-            ) * VIETNAM_ECOST_STAGES[e_stage]
+    def __init__(self, stages: Dict[int, int], vat: int):
+        self.floors = sorted(stages)
+        self.prices = [stages[floor] for floor in self.floors]
+        self.vat = vat
+
+        # prefix[i] = pre-VAT cost of consuming exactly floors[i] kWh
+        self.prefix = [0.0]
+        for i in range(1, len(self.floors)):
+            self.prefix.append(
+                self.prefix[-1]
+                + (self.floors[i] - self.floors[i - 1]) * self.prices[i - 1]
+            )
+
+    def raw_cost(self, kwh: float) -> float:
+        """Cost including VAT, not rounded."""
+        if kwh <= 0:
+            return 0.0
+        i = bisect_right(self.floors, kwh) - 1
+        if i < 0:
+            return 0.0
+        total = self.prefix[i] + (kwh - self.floors[i]) * self.prices[i]
+        return (total / 100) * (100 + self.vat)
+
+    def cost(self, kwh: float) -> int:
+        return int(round(self.raw_cost(kwh)))
+
+    def raw_costs(self, values: Iterable[float]) -> List[float]:
+        if np is None:
+            return [self.raw_cost(kwh) for kwh in values]
+
+        # fromiter, unlike asarray, also takes generators
+        kwh = np.fromiter(values, dtype=float)
+        i = np.searchsorted(self.floors, kwh, side="right") - 1
+        valid = (kwh > 0) & (i >= 0)
+        i = np.clip(i, 0, None)
+        total = (
+            np.asarray(self.prefix)[i]
+            + (kwh - np.asarray(self.floors)[i]) * np.asarray(self.prices)[i]
+        )
+        return np.where(valid, (total / 100) * (100 + self.vat), 0.0).tolist()
+
+    def costs(self, values: Iterable[float]) -> List[int]:
+        """Cost of each value, e.g. a list of monthly totals."""
+        return [int(round(c)) for c in self.raw_costs(values)]
+
+    def marginal_costs(self, values: Iterable[float]) -> List[int]:
+        """Cost of each day as the step in the cumulative cycle cost.
+
+        Same rule as the web UI: day N costs cost(sum of days 1..N) minus
+        cost(sum of days 1..N-1), so later days pay the higher tiers.
+        """
+        totals = self.raw_costs(list(accumulate(values)))
+        return [
+            int(round(cur - prev))
+            for prev, cur in zip([0.0] + totals, totals)
+        ]
+
+
+class TariffSchedule:
+    """Tariffs keyed by effective date, looked up with bisect.
+
+    Days before the first effective date use the oldest known tariff.
+    """
+
+    def __init__(self, tariffs: Iterable[Tuple[date, int, Dict[int, int]]]):
+        tariffs = sorted(tariffs, key=lambda t: t[0])
+        self.dates = [start for start, _, _ in tariffs]
+        self.starts = [start.toordinal() for start in self.dates]
+        self.tariffs = [Tariff(stages, vat) for _, vat, stages in tariffs]
+
+    def at(self, day: Optional[date] = None) -> Tariff:
+        ordinal = (day or date.today()).toordinal()
+        return self.tariffs[max(bisect_right(self.starts, ordinal) - 1, 0)]
+
+    def segments(
+        self, days: Sequence[int]
+    ) -> Iterator[Tuple[int, int, Tariff]]:
+        """Split sorted day ordinals into (lo, hi, tariff) slices."""
+        lo = 0
+        i = max(bisect_right(self.starts, days[0]) - 1, 0) if days else 0
+        while lo < len(days):
+            if i + 1 < len(self.starts):
+                hi = bisect_left(days, self.starts[i + 1], lo)
+            else:
+                hi = len(days)
+            if hi > lo:
+                yield lo, hi, self.tariffs[i]
+            lo = hi
+            i += 1
+
+    def marginal_costs(
+        self, days: Sequence[int], values: Sequence[float]
+    ) -> List[int]:
+        """Tariff.marginal_costs over days that may span tariff changes.
+
+        The cumulative kWh keeps running across a change; each day is
+        priced with the tariff in effect on that day.
+        """
+        totals = list(accumulate(values))
+        out: List[int] = []
+        for lo, hi, tariff in self.segments(days):
+            start = totals[lo - 1] if lo else 0.0
+            costs = tariff.raw_costs([start] + totals[lo:hi])
+            out.extend(
+                int(round(cur - prev)) for prev, cur in zip(costs, costs[1:])
+            )
+        return out
+
+    def as_json(self) -> List[Dict]:
+        """Tariffs in the {limit, price} tier shape used by the web UI."""
+        return [
+            {
+                "from": start.isoformat(),
+                "vat": tariff.vat,
+                "tiers": [
+                    {
+                        "limit": (
+                            tariff.floors[i + 1] - floor
+                            if i + 1 < len(tariff.floors)
+                            else None
+                        ),
+                        "price": tariff.prices[i],
+                    }
+                    for i, floor in enumerate(tariff.floors)
+                ],
+            }
+            for start, tariff in zip(self.dates, self.tariffs)
+        ]
+
+
+VIETNAM_TARIFFS = TariffSchedule(VIETNAM_ECOST_TARIFFS)
+
+
+def calc_ecost(kwh: float, day: Optional[date] = None) -> int:
+    """Calculate electric cost based on e-consumption, priced at day"""
+    return VIETNAM_TARIFFS.at(day).cost(kwh)
 
-    total_price = int(
-        round((total_price / 100) * (100 + VIETNAM_ECOST_VAT))
-    )
 
-    return total_price
-    
 def parse_evnhanoi_money(val: str | None) -> int | None:
     if not val:
         return None
@@ -9,7 +9,8 @@ from pathlib import Path
 from aiohttp import web
 from homeassistant.components.http import HomeAssistantView
 from .const import DOMAIN, CONF_CUSTOMER_ID
-from .data_storage import EVNDataStorage
+from .data_storage import get_storage
+from .utils import VIETNAM_TARIFFS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -156,8 +157,12 @@ class EVNMonthlyDataView(HomeAssistantView):
 
     async def get(self, request, account):
         try:
-            storage = EVNDataStorage(request.app["hass"], account)
-            await storage.async_load()
+            storage = get_storage(request.app["hass"], account)
+            if storage is None:
+                return web.json_response(
+                    {"error": f"Unknown account {account}"},
+                    status=404,
+                )
 
             data = storage.get_data_for_webui()
             return web.json_response(data["monthly"])
@@ -180,8 +185,12 @@ class EVNDailyDataView(HomeAssistantView):
 
     async def get(self, request, account):
         try:
-            storage = EVNDataStorage(request.app["hass"], account)
-            await storage.async_load()
+            storage = get_storage(request.app["hass"], account)
+            if storage is None:
+                return web.json_response(
+                    {"error": f"Unknown account {account}"},
+                    status=404,
+                )
 
             data = storage.get_data_for_webui()
             return web.json_response(data["daily"])
@@ -191,3 +200,98 @@ class EVNDailyDataView(HomeAssistantView):
                 {"error": str(ex)},
                 status=500,
             )
+
+class EVNSummaryDataView(HomeAssistantView):
+    """Return monthly, yearly and billing-cycle rollups."""
+
+    url = "/api/nestup_evn/summary/{account}"
+    name = "api:nestup_evn:summary"
+    requires_auth = False
+
+    def __init__(self, hass):
+        self.hass = hass
+
+    async def get(self, request, account):
+        try:
+            storage = get_storage(request.app["hass"], account)
+            if storage is None:
+                return web.json_response(
+                    {"error": f"Unknown account {account}"},
+                    status=404,
+                )
+
+            return web.json_response(storage.get_summary())
+
+        except Exception as ex:
+            return web.json_response(
+                {"error": str(ex)},
+                status=500,
+            )
+
+class EVNExportView(HomeAssistantView):
+    """Download the history in the legacy JSON layout."""
+
+    url = "/api/nestup_evn/export/{account}"
+    name = "api:nestup_evn:export"
+    requires_auth = False
+
+    def __init__(self, hass):
+        self.hass = hass
+
+    async def get(self, request, account):
+        storage = get_storage(request.app["hass"], account)
+        if storage is None:
+            return web.json_response(
+                {"error": f"Unknown account {account}"},
+                status=404,
+            )
+
+        try:
+            payload = await storage.async_export_json()
+        except Exception as ex:
+            return web.json_response(
+                {"error": str(ex)},
+                status=500,
+            )
+
+        return web.Response(
+            body=payload,
+            content_type="application/json",
+            charset="utf-8",
+            headers={
+                "Content-Disposition": f'attachment; filename="{account}.json"',
+            },
+        )
+
+class EVNTariffView(HomeAssistantView):
+    """Return the residential tariffs by effective date."""
+
+    url = "/api/nestup_evn/tariffs"
+    name = "api:nestup_evn:tariffs"
+    requires_auth = False
+
+    def __init__(self, hass):
+        self.hass = hass
+
+    async def get(self, request):
+        return web.json_response(VIETNAM_TARIFFS.as_json())
+
+class EVNBackfillStatusView(HomeAssistantView):
+    """Return the daily backfill progress of an account."""
+
+    url = "/api/nestup_evn/backfill/{account}"
+    name = "api:nestup_evn:backfill"
+    requires_auth = False
+
+    def __init__(self, hass):
+        self.hass = hass
+
+    async def get(self, request, account):
+        storage = get_storage(request.app["hass"], account)
+        if storage is None:
+            return web.json_response(
+                {"error": f"Unknown account {account}"},
+                status=404,
+            )
+
+        return web.json_response(storage.backfill_progress)
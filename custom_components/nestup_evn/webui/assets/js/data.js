@@ -5,6 +5,8 @@ class DataManager {
         this.dailyData = null;
         this.currentAccount = null;
         this.currentYear = new Date().getFullYear();
+        // Biểu giá điện theo ngày hiệu lực, tải từ /api/nestup_evn/tariffs
+        this.tariffs = null;
         // Cấu hình chu kỳ thanh toán theo tài khoản
         this.billingCycles = {
             // Default: đầu tháng đến cuối tháng
@@ -43,6 +45,8 @@ class DataManager {
         try {
             const baseUrl = this.getBaseUrl();
 
+            await this.loadTariffs();
+
             // Load monthly data
             const monthlyResponse = await fetch(`${baseUrl}/api/nestup_evn/monthly/${account}`);
             if (!monthlyResponse.ok) {
@@ -615,20 +619,46 @@ class DataManager {
         });
     }
 
+    // Load biểu giá điện (chỉ tải một lần)
+    async loadTariffs() {
+        if (this.tariffs) return;
+        try {
+            const response = await fetch(`${this.getBaseUrl()}/api/nestup_evn/tariffs`);
+            if (!response.ok) {
+                throw new Error('Không thể tải biểu giá điện');
+            }
+            this.tariffs = (await response.json()).map(t => ({
+                from: new Date(t.from),
+                vat: t.vat,
+                tiers: t.tiers.map(tier => ({
+                    limit: tier.limit === null ? Infinity : tier.limit,
+                    price: tier.price
+                }))
+            }));
+        } catch (error) {
+            console.error('Lỗi tải biểu giá điện, dùng biểu giá mặc định:', error);
+        }
+    }
+
+    // Biểu giá áp dụng cho một ngày (biểu giá mới nhất có hiệu lực trước ngày đó)
+    getTariff(date = new Date()) {
+        let tariff = DataManager.DEFAULT_TARIFF;
+        if (this.tariffs && this.tariffs.length > 0) {
+            tariff = this.tariffs[0];
+            for (const t of this.tariffs) {
+                if (t.from <= date) tariff = t;
+            }
+        }
+        return tariff;
+    }
+
     // Tính tiền điện theo bậc thang (từ NPC utils.py)
-    tinhTienDien(kwh) {
+    tinhTienDien(kwh, date = new Date()) {
         if (!kwh || kwh <= 0) {
             return { total: 0, details: {} };
         }
 
-        const tiers = [
-            { limit: 50, price: 1984 },
-            { limit: 50, price: 2050 },
-            { limit: 100, price: 2380 },
-            { limit: 100, price: 2998 },
-            { limit: 100, price: 3350 },
-            { limit: Infinity, price: 3460 }
-        ];
+        const { tiers, vat } = this.getTariff(date);
 
         let totalCost = 0;
         let remainingKwh = kwh;
@@ -651,7 +681,7 @@ class DataManager {
             if (remainingKwh <= 0) break;
         }
 
-        const tax = totalCost * 0.08;
+        const tax = totalCost * vat / 100;
         const totalWithTax = totalCost + tax;
 
         return {
@@ -741,5 +771,19 @@ class DataManager {
     }
 }
 
+// Biểu giá dự phòng khi không tải được từ API
+DataManager.DEFAULT_TARIFF = {
+    from: new Date('2025-05-10'),
+    vat: 8,
+    tiers: [
+        { limit: 50, price: 1984 },
+        { limit: 50, price: 2050 },
+        { limit: 100, price: 2380 },
+        { limit: 100, price: 2998 },
+        { limit: 100, price: 3350 },
+        { limit: Infinity, price: 3460 }
+    ]
+};
+
 // Export cho sử dụng global
 window.DataManager = DataManager;
@@ -484,17 +484,7 @@ class ElectricityApp {
 
     // Hàm tính toán tiền điện theo bậc thang tích lũy đúng cách
     calculateDailyCostWithTiers(sortedData) {
-        const tiers = [
-            { limit: 50, price: 1984 },
-            { limit: 50, price: 2050 }, 
-            { limit: 100, price: 2380 },
-            { limit: 100, price: 2998 },
-            { limit: 100, price: 3350 },
-            { limit: Infinity, price: 3460 }
-        ];
-        
         let cumulativeKwh = 0;
-        let previousTotalCost = 0;
         
         // Tính max/min để highlight
         const vals = sortedData.map(d => d["Điện tiêu thụ (kWh)"]);
@@ -503,10 +493,15 @@ class ElectricityApp {
         
         return sortedData.map(day => {
             const kwh = day["Điện tiêu thụ (kWh)"];
+            // Biểu giá có hiệu lực vào ngày này
+            const tariff = this.dataManager.getTariff(
+                new Date(day.Ngày.split('-').reverse().join('-'))
+            );
+            const previousTotalCost = this.calculateCostFromTiers(cumulativeKwh, tariff);
             cumulativeKwh += kwh;
             
             // Tính tổng tiền từ đầu chu kỳ đến ngày hiện tại
-            const currentTotalCost = this.calculateCostFromTiers(cumulativeKwh, tiers);
+            const currentTotalCost = this.calculateCostFromTiers(cumulativeKwh, tariff);
             
             // Tiền điện của ngày hiện tại = tổng tiền hiện tại - tổng tiền ngày trước
             const dailyCost = currentTotalCost - previousTotalCost;
@@ -514,8 +509,6 @@ class ElectricityApp {
             // Tính đơn giá trung bình cho ngày này
             const avgTierPrice = kwh > 0 ? dailyCost / kwh : 0;
             
-            previousTotalCost = currentTotalCost;
-            
             return {
                 date: day.Ngày,
                 kwh: kwh,
@@ -529,7 +522,7 @@ class ElectricityApp {
     }
     
     // Hàm tính tổng tiền điện từ các bậc thang (với thuế)
-    calculateCostFromTiers(totalKwh, tiers) {
+    calculateCostFromTiers(totalKwh, { tiers, vat }) {
         let remainingKwh = totalKwh;
         let totalCost = 0;
         let usedSoFar = 0;
@@ -550,8 +543,8 @@ class ElectricityApp {
             }
         }
         
-        // Thêm thuế VAT 8%
-        const tax = totalCost * 0.08;
+        // Thêm thuế VAT
+        const tax = totalCost * vat / 100;
         return totalCost + tax;
     }showBillingCycleConfig() {
         if (!this.dataManager.currentAccount) {